@@ -1,18 +1,77 @@
+import argparse
 import socket
+import threading
 
+from framing import MAX_FRAME_SIZE, FrameError, FrameReader, send_file, send_frame
+from tcp_pool import ConnectionPool
 
-def tcp_client():
+
+def tcp_client(message="Привет, сервер!"):
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     client_socket.connect(("localhost", 65432))
 
-    message = "Привет, сервер!"
-    client_socket.sendall(message.encode())
+    send_frame(client_socket, message.encode())
 
-    data = client_socket.recv(1024)
-    print(f"Ответ от сервера: {data.decode()}")
+    data = FrameReader(client_socket).recv_frame()
+    print(f"Ответ от сервера: {bytes(data).decode()}")
+
+    client_socket.close()
+
+
+# Несколько сообщений по постоянным соединениям без ожидания каждого ответа
+def tcp_client_pipelined(messages, connections=2):
+    with ConnectionPool(size=connections) as pool:
+        for reply in pool.request_many([m.encode() for m in messages]):
+            print(f"Ответ от сервера: {reply.decode()}")
+
+
+# Отправка файла одним кадром через sendfile и сверка размера эха
+def tcp_send_file(path):
+    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client_socket.connect(("localhost", 65432))
+
+    # Эхо читаем параллельно с отправкой, иначе обе стороны упрутся в полные буферы сокетов
+    echoed, errors = [], []
+    reader = FrameReader(client_socket, max_frame=MAX_FRAME_SIZE)  # эхо читается по частям
+
+    def receive():
+        try:
+            size = reader.read_header()
+            if size is None:
+                raise FrameError("сервер закрыл соединение без ответа")
+            echoed.append(sum(len(chunk) for chunk in reader.iter_chunks(size)))
+        except (OSError, FrameError) as e:
+            errors.append(e)
+
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+    try:
+        size = send_file(client_socket, path)
+    except (OSError, FrameError) as e:
+        size = None
+        errors.append(e)
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)  # приёмник не должен ждать эха вечно
+        except OSError:
+            pass
+    receiver.join()
+    if echoed and size is not None:
+        print(f"Отправлено {size} байт, получено обратно {echoed[0]} байт")
+    else:
+        print(f"Ошибка передачи файла: {errors[0] if errors else 'эхо не получено'}")
 
     client_socket.close()
 
 
 if __name__ == "__main__":
-    tcp_client()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", help="отправить файл вместо текстового сообщения")
+    parser.add_argument("--pipeline", type=int, help="отправить столько сообщений конвейером")
+    args = parser.parse_args()
+
+    if args.file:
+        tcp_send_file(args.file)
+    elif args.pipeline:
+        tcp_client_pipelined([f"Сообщение {i}" for i in range(args.pipeline)])
+    else:
+        tcp_client()
@@ -1,5 +1,11 @@
+import argparse
 import socket
 
+from framing import MAX_FRAME_SIZE, FrameReader, send_frame, send_frame_chunks
+from tcp_echo_server import BACKENDS, run_server
+
+PRINT_LIMIT = 1024
+
 
 def tcp_server():
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -10,12 +16,34 @@ def tcp_server():
     conn, addr = server_socket.accept()
     print(f"Подключен клиент: {addr}")
 
-    data = conn.recv(1024)
-    print(f"Получено сообщение: {data.decode()}")
+    # Кадры с префиксом длины: сообщение любого размера приходит целиком;
+    # в память читаются только короткие, поэтому и большие кадры допустимы
+    reader = FrameReader(conn, max_frame=MAX_FRAME_SIZE)
+    while True:
+        size = reader.read_header()
+        if size is None:
+            break
+        if size <= PRINT_LIMIT:
+            data = reader.read_payload(size)
+            print(f"Получено сообщение: {bytes(data).decode(errors='replace')}")
+            send_frame(conn, data)
+        else:
+            # Большие кадры пересылаем обратно по частям, не держа их в памяти
+            print(f"Получено сообщение: {size} байт")
+            send_frame_chunks(conn, size, reader.iter_chunks(size))
 
-    conn.sendall(data)
     conn.close()
+    server_socket.close()
 
 
 if __name__ == "__main__":
-    tcp_server()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="долгоживущий многоклиентский режим с выбранным бэкендом")
+    parser.add_argument("--duration", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_server(args.backend, duration=args.duration)
+    else:
+        tcp_server()
@@ -1,5 +1,8 @@
+import argparse
 import socket
 
+from udp_batch_server import run_server
+
 
 def udp_server():
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -16,4 +19,14 @@ def udp_server():
 
 
 if __name__ == "__main__":
-    udp_server()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--serve", action="store_true",
+                        help="долгоживущий режим с пакетным приёмом датаграмм")
+    parser.add_argument("--workers", type=int, default=1, help="процессов с SO_REUSEPORT")
+    parser.add_argument("--duration", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_server(workers=args.workers, duration=args.duration)
+    else:
+        udp_server()
@@ -0,0 +1,117 @@
+import os
+import struct
+
+# Протокол с префиксом длины: 8 байт длины (big-endian) + полезная нагрузка.
+# Приём идёт через recv_into в заранее выделенный буфер, отправка - через
+# sendall срезов memoryview, поэтому большие сообщения не копируются по частям.
+
+HEADER = struct.Struct("!Q")
+CHUNK_SIZE = 256 * 1024
+MAX_FRAME_SIZE = 1 << 40  # предел для потоковых читателей (iter_chunks), которые кадр целиком не держат
+DEFAULT_MAX_FRAME = 64 * 2 ** 20  # по умолчанию: кадр может быть прочитан в память целиком
+
+
+class FrameError(Exception):
+    pass
+
+
+def recv_exactly_into(sock, view):
+    received = 0
+    while received < len(view):
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise FrameError("соединение закрыто посреди кадра")
+        received += n
+    return received
+
+
+def send_frame(sock, payload, chunk_size=CHUNK_SIZE):
+    view = memoryview(payload).cast("B")
+    sock.sendall(HEADER.pack(len(view)))
+    for offset in range(0, len(view), chunk_size):
+        sock.sendall(view[offset:offset + chunk_size])
+
+
+def send_frame_chunks(sock, size, chunks):
+    # Отправка кадра известной длины из итератора кусков (например, при ретрансляции)
+    sock.sendall(HEADER.pack(size))
+    sent = 0
+    for chunk in chunks:
+        sock.sendall(chunk)
+        sent += len(chunk)
+    if sent != size:
+        raise FrameError(f"отправлено {sent} байт вместо {size}")
+
+
+def send_file(sock, path):
+    # Файл уходит одним кадром через socket.sendfile (zero-copy, где ОС это умеет)
+    size = os.path.getsize(path)
+    sock.sendall(HEADER.pack(size))
+    with open(path, "rb") as f:
+        sent = sock.sendfile(f, 0, size)
+    if sent != size:
+        raise FrameError(f"отправлено {sent} байт вместо {size}")
+    return size
+
+
+class FrameReader:
+    # max_frame - предел длины из заголовка: read_payload выделяет буфер на весь
+    # кадр, и без предела собеседник заставил бы выделить сколько угодно байт.
+    # Кто читает большие кадры по частям (iter_chunks), передаёт MAX_FRAME_SIZE
+    def __init__(self, sock, buffer_size=CHUNK_SIZE, max_frame=DEFAULT_MAX_FRAME):
+        self.sock = sock
+        self.max_frame = max_frame
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.header = bytearray(HEADER.size)
+
+    def read_header(self):
+        view = memoryview(self.header)
+        n = self.sock.recv_into(view)
+        if n == 0:
+            return None  # штатное закрытие между кадрами
+        if n < HEADER.size:
+            recv_exactly_into(self.sock, view[n:])
+        (size,) = HEADER.unpack(self.header)
+        if size > self.max_frame:
+            raise FrameError(f"слишком большой кадр: {size} байт")
+        return size
+
+    def iter_chunks(self, size):
+        # Отдаёт кадр кусками-представлениями общего буфера; кусок валиден до следующего шага
+        remaining = size
+        while remaining:
+            n = min(remaining, len(self.view))
+            recv_exactly_into(self.sock, self.view[:n])
+            remaining -= n
+            yield self.view[:n]
+
+    def read_payload(self, size):
+        # Целый кадр в памяти; буфер растёт только если кадр в него не помещается
+        if size > len(self.buffer):
+            self.buffer = bytearray(size)
+            self.view = memoryview(self.buffer)
+        recv_exactly_into(self.sock, self.view[:size])
+        return self.view[:size]
+
+    def recv_frame(self):
+        size = self.read_header()
+        if size is None:
+            return None
+        return self.read_payload(size)
+
+    def recv_frame_to_file(self, fileobj):
+        size = self.read_header()
+        if size is None:
+            return None
+        for chunk in self.iter_chunks(size):
+            fileobj.write(chunk)
+        return size
+
+    def echo_frame(self, out_sock):
+        # Потоковое эхо: память ограничена размером буфера при любой длине кадра
+        size = self.read_header()
+        if size is None:
+            return None
+        send_frame_chunks(out_sock, size, self.iter_chunks(size))
+        return size
@@ -0,0 +1,172 @@
+import argparse
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.histogram import LatencyHistogram
+from tcp_pool import ConnectionPool
+
+# Генератор нагрузки для TCP и UDP эхо-серверов: N соединений, заданная
+# скорость (open-loop), пропускная способность и гистограмма задержек.
+
+HOST = "localhost"
+PORT = 65432
+UDP_HEADER = struct.Struct("!Q")
+
+
+class RunStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+
+    def done(self, started):
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.received += 1
+            self.histogram.record(latency)
+
+    def failed(self):
+        with self.lock:
+            self.errors += 1
+
+
+# Расписание отправки: при rate > 0 равномерно, иначе без пауз
+def paced(rate, duration):
+    started = time.perf_counter()
+    deadline = started + duration
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_send = started
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            return
+        if interval:
+            if next_send > now:
+                time.sleep(next_send - now)
+            next_send += interval
+        yield
+
+
+def run_tcp(host, port, connections, rate, duration, size, max_in_flight):
+    stats = RunStats()
+    payload = b"x" * size
+    in_flight = threading.BoundedSemaphore(max_in_flight * connections)
+
+    def on_reply(future, started):
+        in_flight.release()
+        if future.exception() is None:
+            stats.done(started)
+        else:
+            stats.failed()
+
+    with ConnectionPool(host, port, size=connections, max_in_flight=max_in_flight) as pool:
+        pool.open_all()
+        for _ in paced(rate, duration):
+            in_flight.acquire()
+            started = time.perf_counter()
+            try:
+                future = pool.request(payload)
+            except OSError:
+                in_flight.release()
+                stats.failed()
+                continue
+            stats.sent += 1
+            future.add_done_callback(lambda f, s=started: on_reply(f, s))
+        # Дожидаемся ответов на всё, что ещё в полёте
+        deadline = time.perf_counter() + 5.0
+        for _ in range(max_in_flight * connections):
+            if not in_flight.acquire(timeout=max(0.0, deadline - time.perf_counter())):
+                break
+    return stats
+
+
+def run_udp(host, port, connections, rate, duration, size, reply_timeout=1.0):
+    stats = RunStats()
+    sockets = []
+    for _ in range(connections):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect((host, port))
+        sock.settimeout(0.2)
+        sockets.append(sock)
+    sent_at = {}
+    stop = threading.Event()
+    padding = b"x" * max(0, size - UDP_HEADER.size)
+
+    def receive(sock):
+        buffer = bytearray(65536)
+        while not stop.is_set():
+            try:
+                n = sock.recv_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                stats.failed()
+                continue
+            if n < UDP_HEADER.size:
+                continue
+            (seq,) = UDP_HEADER.unpack_from(buffer)
+            started = sent_at.pop(seq, None)
+            if started is not None:
+                stats.done(started)
+
+    receivers = [threading.Thread(target=receive, args=(s,), daemon=True) for s in sockets]
+    for receiver in receivers:
+        receiver.start()
+
+    seq = 0
+    for _ in paced(rate, duration):
+        sent_at[seq] = time.perf_counter()
+        stats.sent += 1
+        try:
+            sockets[seq % connections].send(UDP_HEADER.pack(seq) + padding)
+        except OSError:
+            sent_at.pop(seq, None)
+            stats.failed()
+        seq += 1
+
+    time.sleep(reply_timeout)
+    stop.set()
+    for receiver in receivers:
+        receiver.join()
+    for sock in sockets:
+        sock.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочное тестирование эхо-серверов")
+    parser.add_argument("protocol", choices=["tcp", "udp"])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("-c", "--connections", type=int, default=8)
+    parser.add_argument("-r", "--rate", type=float, default=0, help="сообщений в секунду, 0 - без ограничения")
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("-s", "--size", type=int, default=64, help="размер сообщения в байтах")
+    parser.add_argument("--pipeline", type=int, default=16, help="сообщений в полёте на одно TCP соединение")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.protocol == "tcp":
+        stats = run_tcp(args.host, args.port, args.connections, args.rate, args.duration,
+                        args.size, args.pipeline)
+    else:
+        stats = run_udp(args.host, args.port, args.connections, args.rate, args.duration, args.size)
+    elapsed = time.perf_counter() - started
+
+    lost = stats.sent - stats.received - stats.errors
+    print(f"Отправлено: {stats.sent}, получено: {stats.received}, ошибок: {stats.errors}, потеряно: {lost}")
+    print(f"Пропускная способность: {stats.received / elapsed:.0f} сообщений/с "
+          f"({stats.received * args.size / elapsed / 1e6:.2f} МБ/с)")
+    print(stats.histogram.report())
+
+
+if __name__ == "__main__":
+    main()
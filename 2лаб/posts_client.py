@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.posts_store import Post
+from posts_protocol import DEFAULT_LIMIT, OP_BY_USER, OP_ID_RANGE, OP_SEARCH, decode_rows, encode_request
+from posts_server import HOST, PORT
+from tcp_pool import ConnectionPool
+
+# Клиент сервера постов: постоянные соединения с конвейерной отправкой
+# (tcp_pool), так что много запросов из разных потоков не ждут друг друга.
+# Ответы разбираются в записи Post из common.posts_store.
+
+
+class PostsQueryClient:
+    def __init__(self, host=HOST, port=PORT, connections=1):
+        self.pool = ConnectionPool(host, port, size=connections)
+
+    def request(self, op, *args, limit=DEFAULT_LIMIT):
+        payload = self.pool.request(encode_request(op, *args, limit=limit)).result()
+        return [Post(*row) for row in decode_rows(payload)]
+
+    def by_user(self, user_id, limit=DEFAULT_LIMIT):
+        return self.request(OP_BY_USER, user_id, limit=limit)
+
+    def id_range(self, low, high, limit=DEFAULT_LIMIT):
+        # Полуинтервал [low, high)
+        return self.request(OP_ID_RANGE, low, high, limit=limit)
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        return self.request(OP_SEARCH, text, limit=limit)
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Запросы к серверу постов")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--user", type=int, help="посты автора")
+    group.add_argument("--range", type=int, nargs=2, metavar=("LOW", "HIGH"), help="id в [LOW, HIGH)")
+    group.add_argument("--search", help="поиск по заголовку")
+    args = parser.parse_args()
+
+    with PostsQueryClient(args.host, args.port) as client:
+        if args.user is not None:
+            posts = client.by_user(args.user, args.limit)
+        elif args.range:
+            posts = client.id_range(*args.range, limit=args.limit)
+        else:
+            posts = client.search(args.search, args.limit)
+    for post in posts:
+        print(f"ID: {post.id}, User ID: {post.user_id}, Title: {post.title}")
+    print(f"Найдено: {len(posts)}")
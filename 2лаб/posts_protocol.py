@@ -0,0 +1,96 @@
+import struct
+
+# Двоичный протокол сервера постов поверх кадров framing.py (8 байт длины +
+# полезная нагрузка). Никакого JSON: числа упакованы struct, строки - UTF-8
+# с длиной в заголовке строки.
+#
+# Запрос:  op (1 байт), limit (4 байта), дальше аргументы операции:
+#   BY_USER  - user_id (8 байт)
+#   ID_RANGE - low, high (по 8 байт), полуинтервал [low, high)
+#   SEARCH   - текст UTF-8 до конца кадра (поиск по заголовку)
+# Ответ:   status (1 байт), count (4 байта), затем count строк:
+#   id, user_id (по 8 байт), длина title, длина body (по 4 байта), title, body.
+#   При status != OK вместо строк - текст ошибки UTF-8.
+
+OP_BY_USER = 1
+OP_ID_RANGE = 2
+OP_SEARCH = 3
+OPS = (OP_BY_USER, OP_ID_RANGE, OP_SEARCH)
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+REQUEST = struct.Struct("!BI")
+RESPONSE = struct.Struct("!BI")
+ROW = struct.Struct("!qqII")
+INT64 = struct.Struct("!q")
+RANGE = struct.Struct("!qq")
+
+DEFAULT_LIMIT = 200
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_request(op, *args, limit=DEFAULT_LIMIT):
+    head = REQUEST.pack(op, limit)
+    if op == OP_BY_USER:
+        return head + INT64.pack(*args)
+    if op == OP_ID_RANGE:
+        return head + RANGE.pack(*args)
+    if op == OP_SEARCH:
+        return head + args[0].encode("utf-8")
+    raise ProtocolError(f"неизвестная операция {op}")
+
+
+def decode_request(payload):
+    # -> (op, аргументы, limit); payload - bytes или memoryview
+    if len(payload) < REQUEST.size:
+        raise ProtocolError("короткий запрос")
+    op, limit = REQUEST.unpack_from(payload)
+    body = payload[REQUEST.size:]
+    try:
+        if op == OP_BY_USER:
+            return op, INT64.unpack(body), limit
+        if op == OP_ID_RANGE:
+            return op, RANGE.unpack(body), limit
+        if op == OP_SEARCH:
+            return op, (bytes(body).decode("utf-8"),), limit
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"неверные аргументы: {e}")
+    raise ProtocolError(f"неизвестная операция {op}")
+
+
+def encode_rows(rows):
+    # rows - кортежи (id, user_id, title, body) из SQLite
+    parts = [RESPONSE.pack(STATUS_OK, len(rows))]
+    for post_id, user_id, title, body in rows:
+        title = (title or "").encode("utf-8")
+        body = (body or "").encode("utf-8")
+        parts.append(ROW.pack(post_id, user_id or 0, len(title), len(body)))
+        parts.append(title)
+        parts.append(body)
+    return b"".join(parts)
+
+
+def encode_error(message):
+    return RESPONSE.pack(STATUS_ERROR, 0) + message.encode("utf-8")
+
+
+def decode_rows(payload):
+    status, count = RESPONSE.unpack_from(payload)
+    if status != STATUS_OK:
+        raise ProtocolError(bytes(payload[RESPONSE.size:]).decode("utf-8", errors="replace"))
+    view = memoryview(payload)
+    rows = []
+    offset = RESPONSE.size
+    for _ in range(count):
+        post_id, user_id, title_len, body_len = ROW.unpack_from(view, offset)
+        offset += ROW.size
+        title = str(view[offset:offset + title_len], "utf-8")
+        offset += title_len
+        body = str(view[offset:offset + body_len], "utf-8")
+        offset += body_len
+        rows.append((post_id, user_id, title, body))
+    return rows
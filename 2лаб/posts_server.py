@@ -0,0 +1,268 @@
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.metrics import count, span
+from common.posts_db import LABA3_COLUMNS, LABA5_COLUMNS
+from common.posts_search import FTS_TABLE, search_ids
+from framing import FrameError, FrameReader, send_frame
+from posts_protocol import (OP_BY_USER, OP_ID_RANGE, OP_SEARCH, ProtocolError, decode_request,
+                            encode_error, encode_rows)
+from tcp_echo_server import create_listener
+
+# Сервер запросов к таблице posts (Laba3.db / Laba5.db) по TCP: выборка по
+# автору, по диапазону id и поиск по заголовку. Клиенты не открывают файл
+# базы сами; сервер читает через пул соединений (по одному на рабочий поток,
+# только чтение), а готовые двоичные ответы держит в LRU-кэше. Любая запись
+# в базу - из этого процесса или из другого - меняет PRAGMA data_version
+# отдельного соединения-сторожа, и кэш сбрасывается перед следующим запросом.
+
+HOST = "localhost"
+PORT = 65433
+CACHE_ENTRIES = 1024
+CACHE_BYTES = 64 * 2 ** 20
+MAX_LIMIT = 10_000
+REJECT_TIMEOUT = 1.0
+MAX_REQUEST = 64 * 1024  # запросы короткие; длинный заголовок - ошибка, а не повод выделить память
+
+
+class ResultCache:
+    # LRU готовых ответов; generation растёт при каждом сбросе, чтобы ответ,
+    # посчитанный по старым данным, не попал в кэш после сброса
+    def __init__(self, entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES):
+        self.entries = entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.values = OrderedDict()
+        self.bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.values.get(key)
+            if value is None:
+                self.misses += 1
+                return None, self.generation
+            self.values.move_to_end(key)
+            self.hits += 1
+            return value, self.generation
+
+    def put(self, key, value, generation):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if generation != self.generation or key in self.values:
+                return
+            self.values[key] = value
+            self.bytes += len(value)
+            while len(self.values) > self.entries or self.bytes > self.max_bytes:
+                _, evicted = self.values.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+            self.bytes = 0
+            self.generation += 1
+
+    def summary(self):
+        with self.lock:
+            total = self.hits + self.misses
+            rate = self.hits / total * 100 if total else 0
+            return (f"кэш: {len(self.values)} ответов, {self.bytes / 1024:.0f} КБ, "
+                    f"попаданий {self.hits} из {total} ({rate:.0f}%), сбросов {self.generation}")
+
+
+def table_columns(path, table="posts"):
+    # Laba3 хранит user_id, Laba5 - userId
+    conn = sqlite3.connect(path)
+    try:
+        names = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    finally:
+        conn.close()
+    if not names:
+        raise sqlite3.OperationalError(f"в {path} нет таблицы {table}")
+    return LABA5_COLUMNS if "userId" in names else LABA3_COLUMNS
+
+
+class PostsQueryServer:
+    def __init__(self, path, columns=None, table="posts", cache=None):
+        self.columns = columns or table_columns(path, table)
+        self.table = table
+        # query_only: соединения сервера не могут ничего записать
+        self.pool = ConnectionPool(path, pragmas={"query_only": 1})
+        self.cache = cache or ResultCache()
+        conn = self.pool.connection()
+        self.fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone() is not None
+        self.pool.release()
+        # data_version сравнимо только в пределах одного соединения, поэтому
+        # запись отслеживает одно общее соединение; базовая версия - при открытии
+        # (после первого соединения пула: оно могло перевести базу в WAL)
+        self.version_conn = sqlite3.connect(path, check_same_thread=False)
+        self.version_conn.execute("PRAGMA query_only = 1")
+        self.version_lock = threading.Lock()
+        self.data_version = self.version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+        id_col, user_col, title_col, body_col = self.columns
+        self.select_sql = f"SELECT {id_col}, {user_col}, {title_col}, {body_col} FROM {table}"
+
+    # --- запросы ---
+
+    def check_version(self):
+        # data_version меняется, когда другое соединение зафиксировало запись;
+        # на одну запись - один сброс, сколько бы соединений ни было в пуле
+        with self.version_lock:
+            version = self.version_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self.data_version:
+                self.data_version = version
+                self.cache.clear()
+                count("posts_server.invalidations")
+
+    def query(self, conn, op, args, limit):
+        id_col, user_col = self.columns[:2]
+        if op == OP_BY_USER:
+            return conn.execute(f"{self.select_sql} WHERE {user_col} = ? ORDER BY {id_col} LIMIT ?",
+                                (*args, limit)).fetchall()
+        if op == OP_ID_RANGE:
+            return conn.execute(f"{self.select_sql} WHERE {id_col} >= ? AND {id_col} < ? ORDER BY {id_col} LIMIT ?",
+                                (*args, limit)).fetchall()
+        if op == OP_SEARCH:
+            ids = search_ids(conn, args[0], limit, self.columns, self.table, fts=self.fts, title_only=True)
+            if not ids:
+                return []
+            rows = conn.execute(f"{self.select_sql} WHERE {id_col} IN ({', '.join('?' * len(ids))})",
+                                ids).fetchall()
+            by_id = {row[0]: row for row in rows}
+            return [by_id[i] for i in ids if i in by_id]  # порядок релевантности
+        raise ProtocolError(f"неизвестная операция {op}")
+
+    def answer(self, payload):
+        # Кадр запроса -> кадр ответа (bytes); ошибки запроса возвращаются клиенту
+        try:
+            op, args, limit = decode_request(payload)
+            limit = min(limit, MAX_LIMIT)
+            self.check_version()
+            conn = self.pool.connection()
+            key = (op, args, limit)
+            response, generation = self.cache.get(key)
+            if response is not None:
+                count("posts_server.cache_hits")
+                return response
+            with span("posts_server.query"):
+                response = encode_rows(self.query(conn, op, args, limit))
+            self.cache.put(key, response, generation)
+            return response
+        except (ProtocolError, sqlite3.Error) as e:
+            return encode_error(str(e))
+
+    # --- сеть ---
+
+    def handle(self, conn):
+        # Как в tcp_server(): кадры с префиксом длины, ответы в порядке запросов
+        try:
+            with conn:
+                reader = FrameReader(conn, buffer_size=MAX_REQUEST, max_frame=MAX_REQUEST)
+                while True:
+                    payload = reader.recv_frame()
+                    if payload is None:
+                        break
+                    send_frame(conn, self.answer(payload))
+        except (OSError, FrameError):
+            pass
+        finally:
+            self.pool.release()
+
+    def reject(self, conn):
+        # Ответ об ошибке на первый запрос вместо молчания, затем соединение закрывается.
+        # Запрос ждём недолго: отказ не должен занимать поток надолго
+        count("posts_server.rejected")
+        try:
+            conn.settimeout(REJECT_TIMEOUT)
+            if FrameReader(conn, buffer_size=MAX_REQUEST, max_frame=MAX_REQUEST).recv_frame() is not None:
+                send_frame(conn, encode_error("сервер занят: слишком много соединений"))
+        except (OSError, FrameError):
+            pass
+        finally:
+            conn.close()
+
+    def serve(self, host=HOST, port=PORT, stop_event=None, workers=64, ready=None):
+        # Каждый клиент занимает рабочий поток, пока не отключится; сверх workers
+        # клиенты получают отказ, а не ждут без ответа, пока кто-то уйдёт
+        stop_event = stop_event or threading.Event()
+        server_socket = create_listener(host, port)
+        server_socket.settimeout(0.2)
+        if ready is not None:
+            ready.set()
+        connections = set()
+
+        def handle(conn):
+            try:
+                self.handle(conn)
+            finally:
+                connections.discard(conn)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while not stop_event.is_set():
+                    try:
+                        conn, _ = server_socket.accept()
+                    except socket.timeout:
+                        continue
+                    conn.settimeout(None)
+                    if len(connections) >= workers:
+                        threading.Thread(target=self.reject, args=(conn,), daemon=True).start()
+                        continue
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    connections.add(conn)
+                    pool.submit(handle, conn)
+            finally:
+                server_socket.close()
+                for conn in list(connections):
+                    try:
+                        conn.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+    def close(self):
+        self.pool.close_all()
+        self.version_conn.close()
+
+
+def start_server(path, host=HOST, port=PORT, **options):
+    # Сервер в фоновом потоке (для проверок и бенчмарков); возвращает (сервер, stop_event)
+    server = PostsQueryServer(path, **options)
+    stop_event, ready = threading.Event(), threading.Event()
+    threading.Thread(target=server.serve, args=(host, port, stop_event), kwargs={"ready": ready},
+                     daemon=True).start()
+    ready.wait()
+    return server, stop_event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TCP-сервер запросов к постам")
+    parser.add_argument("database", help="файл SQLite с таблицей posts (Laba3.db, Laba5.db)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=64, help="одновременных клиентов")
+    parser.add_argument("--cache", type=int, default=CACHE_ENTRIES, help="ответов в кэше")
+    args = parser.parse_args()
+
+    server = PostsQueryServer(args.database, cache=ResultCache(args.cache))
+    print(f"Сервер постов ({args.database}, колонки {', '.join(server.columns)}) слушает {args.host}:{args.port}")
+    try:
+        server.serve(args.host, args.port, workers=args.workers)
+    except KeyboardInterrupt:
+        pass
+    print(server.cache.summary())
+    print(server.pool.summary())
+    server.close()
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Долгоживущий эхо-сервер с выбором бэкенда: asyncio, selectors или пул потоков
+
+HOST = "localhost"
+PORT = 65432
+BUFFER_SIZE = 65536
+
+
+# Счётчики подключений и задержек эха (общие для всех бэкендов)
+class EchoStats:
+    def __init__(self, sample_size=100000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=sample_size)
+        self.total_connections = 0
+        self.active_connections = 0
+        self.total_echoes = 0
+        self.total_bytes = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.last_connections = 0
+
+    def connection_opened(self):
+        with self.lock:
+            self.total_connections += 1
+            self.active_connections += 1
+
+    def connection_closed(self):
+        with self.lock:
+            self.active_connections -= 1
+
+    def echo_done(self, started, size):
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.latencies.append(latency)
+            self.total_echoes += 1
+            self.total_bytes += size
+
+    def percentile(self, samples, p):
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        with self.lock:
+            now = time.perf_counter()
+            interval = now - self.last_report or 1e-9
+            conn_rate = (self.total_connections - self.last_connections) / interval
+            self.last_report = now
+            self.last_connections = self.total_connections
+            samples = sorted(self.latencies)
+            return {
+                "uptime": now - self.started,
+                "connections_total": self.total_connections,
+                "connections_active": self.active_connections,
+                "connections_per_sec": conn_rate,
+                "echoes": self.total_echoes,
+                "bytes": self.total_bytes,
+                "p50_ms": self.percentile(samples, 50) * 1000,
+                "p99_ms": self.percentile(samples, 99) * 1000,
+            }
+
+    def report(self):
+        s = self.snapshot()
+        print(f"[{s['uptime']:.0f} c] подключений: {s['connections_total']} "
+              f"(активных {s['connections_active']}, {s['connections_per_sec']:.1f}/с), "
+              f"эхо: {s['echoes']}, p50: {s['p50_ms']:.3f} мс, p99: {s['p99_ms']:.3f} мс")
+
+
+def create_listener(host, port, blocking=True):
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(socket.SOMAXCONN)
+    server_socket.setblocking(blocking)
+    return server_socket
+
+
+# Бэкенд на asyncio streams
+def serve_asyncio(host, port, stats, stop_event):
+    async def handle(reader, writer):
+        stats.connection_opened()
+        try:
+            while True:
+                data = await reader.read(BUFFER_SIZE)
+                if not data:
+                    break
+                started = time.perf_counter()
+                writer.write(data)
+                await writer.drain()
+                stats.echo_done(started, len(data))
+        except ConnectionError:
+            pass
+        finally:
+            stats.connection_closed()
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, sock=create_listener(host, port))
+        async with server:
+            while not stop_event.is_set():
+                await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+
+
+# Бэкенд на selectors: один поток, неблокирующие сокеты
+def serve_selectors(host, port, stats, stop_event):
+    selector = selectors.DefaultSelector()
+    server_socket = create_listener(host, port, blocking=False)
+    selector.register(server_socket, selectors.EVENT_READ)
+    pending = {}  # сокет -> неотправленный остаток
+
+    def close(conn):
+        selector.unregister(conn)
+        pending.pop(conn, None)
+        conn.close()
+        stats.connection_closed()
+
+    def flush(conn):
+        buffer = pending[conn]
+        try:
+            sent = conn.send(buffer)
+        except BlockingIOError:
+            sent = 0
+        except ConnectionError:
+            close(conn)
+            return False
+        del buffer[:sent]
+        if buffer:
+            selector.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        else:
+            selector.modify(conn, selectors.EVENT_READ)
+        return True
+
+    try:
+        while not stop_event.is_set():
+            for key, mask in selector.select(timeout=0.2):
+                if key.fileobj is server_socket:
+                    try:
+                        while True:
+                            conn, _ = server_socket.accept()
+                            conn.setblocking(False)
+                            pending[conn] = bytearray()
+                            selector.register(conn, selectors.EVENT_READ)
+                            stats.connection_opened()
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                conn = key.fileobj
+                if mask & selectors.EVENT_WRITE:
+                    if not flush(conn):
+                        continue
+                if mask & selectors.EVENT_READ:
+                    try:
+                        data = conn.recv(BUFFER_SIZE)
+                    except BlockingIOError:
+                        continue
+                    except ConnectionError:
+                        close(conn)
+                        continue
+                    if not data:
+                        close(conn)
+                        continue
+                    started = time.perf_counter()
+                    pending[conn] += data
+                    if flush(conn):
+                        stats.echo_done(started, len(data))
+    finally:
+        for conn in list(pending):
+            close(conn)
+        selector.unregister(server_socket)
+        server_socket.close()
+        selector.close()
+
+
+# Бэкенд на пуле потоков: одно блокирующее соединение на поток (для сравнения)
+def serve_threadpool(host, port, stats, stop_event, workers=256):
+    server_socket = create_listener(host, port)
+    server_socket.settimeout(0.2)
+    connections = set()
+
+    def handle(conn):
+        stats.connection_opened()
+        try:
+            with conn:
+                while True:
+                    data = conn.recv(BUFFER_SIZE)
+                    if not data:
+                        break
+                    started = time.perf_counter()
+                    conn.sendall(data)
+                    stats.echo_done(started, len(data))
+        except OSError:
+            pass
+        finally:
+            connections.discard(conn)
+            stats.connection_closed()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while not stop_event.is_set():
+                try:
+                    conn, _ = server_socket.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                connections.add(conn)
+                pool.submit(handle, conn)
+        finally:
+            server_socket.close()
+            # Разблокируем потоки, ждущие recv, чтобы пул мог завершиться
+            for conn in list(connections):
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+BACKENDS = {
+    "asyncio": serve_asyncio,
+    "selectors": serve_selectors,
+    "threadpool": serve_threadpool,
+}
+
+
+def run_server(backend="selectors", host=HOST, port=PORT, duration=None, report_interval=5.0,
+               stop_event=None, stats=None):
+    stats = stats or EchoStats()
+    stop_event = stop_event or threading.Event()
+
+    def reporter():
+        while not stop_event.wait(report_interval):
+            stats.report()
+
+    if report_interval:
+        threading.Thread(target=reporter, daemon=True).start()
+    if duration:
+        threading.Timer(duration, stop_event.set).start()
+
+    print(f"TCP эхо-сервер ({backend}) слушает {host}:{port}")
+    try:
+        BACKENDS[backend](host, port, stats, stop_event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+    stats.report()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Многоклиентский TCP эхо-сервер")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="selectors")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--duration", type=float, default=None, help="время работы в секундах")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    run_server(args.backend, args.host, args.port, args.duration, args.report_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import itertools
+import socket
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from framing import FrameError, FrameReader, send_frame
+
+# Клиент с постоянными соединениями и конвейерной отправкой (pipelining).
+# Сервер отвечает кадрами в порядке запросов, поэтому ответы на одном
+# соединении сопоставляются с ожидающими Future по очереди FIFO.
+
+HOST = "localhost"
+PORT = 65432
+
+
+class PipelinedConnection:
+    def __init__(self, host=HOST, port=PORT, timeout=10.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(None)
+        self.send_lock = threading.Lock()
+        self.pending = deque()
+        self.closed = False
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def in_flight(self):
+        return len(self.pending)
+
+    def request(self, payload):
+        future = Future()
+        with self.send_lock:
+            if self.closed:
+                raise ConnectionError("соединение закрыто")
+            # Future ставится в очередь до отправки, чтобы ответ не опередил его
+            self.pending.append(future)
+            try:
+                send_frame(self.sock, payload)
+            except OSError as e:
+                self._fail(e)
+                raise
+        return future
+
+    def _read_loop(self):
+        reader = FrameReader(self.sock)
+        try:
+            while True:
+                data = reader.recv_frame()
+                if data is None:
+                    break
+                self.pending.popleft().set_result(bytes(data))
+        except (OSError, FrameError, IndexError) as e:
+            self._fail(e)
+            return
+        self._fail(ConnectionError("сервер закрыл соединение"))
+
+    def _fail(self, error):
+        self.closed = True
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        with self.send_lock:
+            self.closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        self.reader.join(timeout=1.0)
+
+
+class ConnectionPool:
+    def __init__(self, host=HOST, port=PORT, size=4, max_in_flight=128):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.max_in_flight = max_in_flight
+        self.lock = threading.Lock()
+        self.connections = []
+        self.round_robin = itertools.count()
+
+    def _acquire(self):
+        with self.lock:
+            self.connections = [c for c in self.connections if not c.closed]
+            # Новое соединение открываем, только если живые уже загружены
+            if len(self.connections) < self.size and (
+                    not self.connections or min(c.in_flight() for c in self.connections) > 0):
+                connection = PipelinedConnection(self.host, self.port)
+                self.connections.append(connection)
+                return connection
+            connection = min(self.connections, key=lambda c: c.in_flight())
+            if connection.in_flight() >= self.max_in_flight:
+                connection = self.connections[next(self.round_robin) % len(self.connections)]
+            return connection
+
+    def open_all(self):
+        with self.lock:
+            while len(self.connections) < self.size:
+                self.connections.append(PipelinedConnection(self.host, self.port))
+
+    def request(self, payload):
+        return self._acquire().request(payload)
+
+    def request_many(self, payloads):
+        # Все сообщения отправляются сразу и ждутся вместе
+        futures = [self.request(p) for p in payloads]
+        return [f.result() for f in futures]
+
+    def close(self):
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,238 @@
+import argparse
+import ctypes
+import multiprocessing
+import selectors
+import socket
+import sys
+import threading
+import time
+
+# Долгоживущий UDP эхо-сервер: за одно пробуждение обрабатывается пачка
+# датаграмм. На Linux используются recvmmsg/sendmmsg через ctypes, в
+# остальных случаях - цикл recvfrom_into по тем же заранее выделенным буферам.
+
+HOST = "localhost"
+PORT = 65432
+DATAGRAM_SIZE = 2048
+BATCH_SIZE = 64
+MSG_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0x40)
+SOCKADDR_SIZE = 128  # sizeof(struct sockaddr_storage)
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", msghdr), ("msg_len", ctypes.c_uint)]
+
+
+def load_mmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        recvmmsg, sendmmsg = libc.recvmmsg, libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr), ctypes.c_uint, ctypes.c_int]
+    return recvmmsg, sendmmsg
+
+
+# Пул буферов выделяется один раз и переиспользуется для каждой пачки
+class BufferPool:
+    def __init__(self, count=BATCH_SIZE, size=DATAGRAM_SIZE):
+        self.size = size
+        self.buffers = [(ctypes.c_char * size)() for _ in range(count)]
+        self.views = [memoryview(b).cast("B") for b in self.buffers]
+
+    def __len__(self):
+        return len(self.buffers)
+
+
+class MmsgBatch:
+    def __init__(self, pool, functions):
+        self.pool = pool
+        self.recvmmsg, self.sendmmsg = functions
+        count = len(pool)
+        self.names = [(ctypes.c_char * SOCKADDR_SIZE)() for _ in range(count)]
+        self.iovecs = (iovec * count)()
+        self.messages = (mmsghdr * count)()
+        for i in range(count):
+            self.iovecs[i].iov_base = ctypes.addressof(pool.buffers[i])
+            header = self.messages[i].msg_hdr
+            header.msg_name = ctypes.addressof(self.names[i])
+            header.msg_iov = ctypes.pointer(self.iovecs[i])
+            header.msg_iovlen = 1
+
+    def echo(self, sock):
+        count = len(self.pool)
+        for i in range(count):
+            self.iovecs[i].iov_len = self.pool.size
+            self.messages[i].msg_hdr.msg_namelen = SOCKADDR_SIZE
+        received = self.recvmmsg(sock.fileno(), self.messages, count, MSG_DONTWAIT, None)
+        if received < 0:
+            return 0, 0
+        size = 0
+        for i in range(received):
+            # Ответ уходит на тот же адрес, длина - ровно принятая
+            self.iovecs[i].iov_len = self.messages[i].msg_len
+            size += self.messages[i].msg_len
+        sent = 0
+        while sent < received:
+            n = self.sendmmsg(sock.fileno(), ctypes.pointer(self.messages[sent]), received - sent, 0)
+            if n <= 0:
+                break
+            sent += n
+        return received, size
+
+
+class FallbackBatch:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def echo(self, sock):
+        replies = []
+        size = 0
+        for view in self.pool.views:
+            try:
+                n, addr = sock.recvfrom_into(view, 0, MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                break
+            replies.append((view[:n], addr))
+            size += n
+        for data, addr in replies:
+            try:
+                sock.sendto(data, addr)
+            except BlockingIOError:
+                pass
+        return len(replies), size
+
+
+def create_socket(host, port, reuse_port=False, rcvbuf=4 << 20):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind((host, port))
+    return sock
+
+
+# Счётчик отброшенных ядром датаграмм по всем сокетам на порту (Linux)
+def kernel_drops(port):
+    total = 0
+    for path in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(path) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        total += int(fields[-1])
+        except (OSError, ValueError, IndexError, StopIteration):
+            continue
+    return total
+
+
+def serve(host, port, counters, stop_event, batch_size=BATCH_SIZE, reuse_port=False, use_mmsg=True):
+    sock = create_socket(host, port, reuse_port)
+    sock.setblocking(False)
+    pool = BufferPool(batch_size)
+    functions = load_mmsg() if use_mmsg else None
+    batch = MmsgBatch(pool, functions) if functions else FallbackBatch(pool)
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    try:
+        while not stop_event.is_set():
+            if not selector.select(timeout=0.2):
+                continue
+            packets, size = batch.echo(sock)
+            if packets:
+                with counters.get_lock():
+                    counters[0] += packets
+                    counters[1] += size
+                    counters[2] += 1
+    finally:
+        selector.close()
+        sock.close()
+
+
+def report(counters, previous, elapsed, port):
+    # elapsed - сколько реально прошло с прошлого отчёта (последний отрезок бывает короче)
+    packets, size, wakeups = counters[:]
+    elapsed = max(elapsed, 1e-9)
+    rate = (packets - previous[0]) / elapsed
+    per_wakeup = (packets - previous[0]) / max(1, wakeups - previous[2])
+    print(f"пакетов: {packets} ({rate:.0f}/с, {(size - previous[1]) / elapsed / 1e6:.2f} МБ/с), "
+          f"пакетов за пробуждение: {per_wakeup:.1f}, отброшено ядром: {kernel_drops(port)}")
+    return packets, size, wakeups
+
+
+def run_server(host=HOST, port=PORT, workers=1, batch_size=BATCH_SIZE, use_mmsg=True,
+               duration=None, report_interval=5.0):
+    # Общие счётчики: пакеты, байты, пробуждения
+    counters = multiprocessing.Array("q", 3)
+    reuse_port = workers > 1
+    if reuse_port:
+        stop_event = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(target=serve, args=(host, port, counters, stop_event, batch_size, True, use_mmsg))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+    else:
+        stop_event = threading.Event()
+        processes = [threading.Thread(target=serve, args=(host, port, counters, stop_event, batch_size, False, use_mmsg))]
+        processes[0].start()
+
+    mode = "recvmmsg/sendmmsg" if use_mmsg and load_mmsg() else "recvfrom_into"
+    print(f"UDP эхо-сервер ({mode}, процессов: {workers}) слушает {host}:{port}")
+    started = last = time.perf_counter()
+    previous = (0, 0, 0)
+    try:
+        while not duration or last - started < duration:
+            remaining = duration - (last - started) if duration else report_interval
+            time.sleep(min(report_interval, remaining))
+            now = time.perf_counter()
+            previous = report(counters, previous, now - last, port)
+            last = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join()
+    return counters[:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP эхо-сервер с пакетным приёмом")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=1, help="процессов с SO_REUSEPORT")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-mmsg", action="store_true", help="принудительно использовать recvfrom_into")
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    run_server(args.host, args.port, args.workers, args.batch, not args.no_mmsg,
+               args.duration, args.report_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,49 @@
-import sqlite3
+import os
+import sys
+
 import requests
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.http_cache import HttpCache
+from common.posts_api import PostsClient
+from common.posts_db import LABA3_COLUMNS
+from common.posts_search import ensure_search, posts_by_user
+from common.posts_stream import StreamError, ingest_from_http
+
 # Создание базы данных и таблицы posts
-conn = sqlite3.connect('Laba3.db')
-cursor = conn.cursor()
-
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS posts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        title TEXT,
-        body TEXT
-    )
-''')
-conn.commit()
-
-# Получение данных с сервера
-url = 'https://jsonplaceholder.typicode.com/posts'
-response = requests.get(url)
-
-if response.status_code == 200:
-    posts = response.json()
-else:
-    print(f"Ошибка при выполнении запроса: {response.status_code}")
-
-# Сохранение данных в базу данных
-for post in posts:
-    cursor.execute('''
-        INSERT OR IGNORE INTO posts (id, user_id, title, body)
-        VALUES (?, ?, ?, ?)
-    ''', (post['id'], post['userId'], post['title'], post['body']))
-
-conn.commit()
-print("Данные успешно сохранены в базу данных.")
+db = ConnectionPool('Laba3.db')
+conn = db.connection()
+
+with conn:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            title TEXT,
+            body TEXT
+        )
+    ''')
+
+# Индекс по user_id и полнотекстовый индекс по title/body
+ensure_search(conn)
+
+# Получение данных с сервера и сохранение в базу: ответ разбирается по мере
+# загрузки, а в базу попадают только новые, изменённые и удалённые посты
+with PostsClient(cache=HttpCache()) as client:
+    try:
+        pipeline = ingest_from_http(client.session, client.posts_url, conn, LABA3_COLUMNS,
+                                    cache=client.cache, timeout=client.timeout, sync=True)
+        print(f"Данные успешно сохранены в базу данных ({pipeline.sync_stats}).")
+    except (requests.RequestException, StreamError) as e:
+        print(f"Ошибка при выполнении запроса: {e}")
+    print(client.cache.summary())
 
 # Чтение данных из базы
 def get_posts_by_user(user_id):
-    cursor.execute('''
-        SELECT * FROM posts WHERE user_id = ?
-    ''', (user_id,))
-    
-    posts = cursor.fetchall()
-    
+    posts = posts_by_user(conn, user_id)
+
     if posts:
         for post in posts:
             print(f"ID: {post[0]}, User ID: {post[1]}, Title: {post[2]}, Body: {post[3]}")
@@ -50,4 +52,5 @@ def get_posts_by_user(user_id):
 
 get_posts_by_user(7)
 
-conn.close()
+print(db.summary())
+db.close_all()
@@ -1,9 +1,76 @@
+import csv
+import io
+import os
 import sys
+import sqlite3
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableView, QLineEdit, QPushButton, QVBoxLayout, QWidget, QHBoxLayout, QMessageBox, QInputDialog
+    QApplication, QMainWindow, QTableView, QLineEdit, QPushButton, QVBoxLayout, QWidget, QHBoxLayout, QMessageBox, QInputDialog,
+    QAbstractItemView, QFileDialog
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtSql import QSqlDatabase, QSqlTableModel, QSqlQuery
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.paged_model import PagedPostsModel
+from common.posts_search import ensure_search, search_ids
+
+DB_NAME = "Laba3.db"
+SEARCH_DELAY_MS = 250  # пауза после последнего нажатия перед запросом
+
+
+# Строки (user_id, title, body) из CSV или из таблицы, скопированной в буфер
+# (колонки через табуляцию). Если есть заголовок - колонки берутся по именам,
+# иначе последние три; так строки, скопированные вместе с id, тоже подходят
+def parse_rows(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+    delimiter = "\t" if "\t" in lines[0] else ","
+    records = list(csv.reader(io.StringIO("\n".join(lines)), delimiter=delimiter))
+    header = [name.strip().lower() for name in records[0]]
+    if "title" in header and "body" in header:
+        user = header.index("userid") if "userid" in header else header.index("user_id")
+        title, body = header.index("title"), header.index("body")
+        records = records[1:]
+    else:
+        user, title, body = -3, -2, -1
+    rows = []
+    for record in records:
+        if len(record) < 3:
+            raise ValueError(f"в строке меньше трёх колонок: {delimiter.join(record)}")
+        rows.append((record[user].strip(), record[title], record[body]))
+    return rows
+
+
+# Поиск в отдельном потоке на соединении из пула; устаревший запрос
+# прерывается обработчиком прогресса, а не interrupt(), чтобы не задеть
+# следующий поток, которому соединение достанется после возврата в пул
+class SearchThread(QThread):
+    results_ready = pyqtSignal(int, list)
+
+    def __init__(self, pool, generation, text, fts):
+        super().__init__()
+        self.pool = pool
+        self.generation = generation
+        self.text = text
+        self.fts = fts
+        self.cancelled = False
+
+    def run(self):
+        conn = self.pool.connection()
+        conn.set_progress_handler(lambda: self.cancelled, 1000)
+        try:
+            ids = search_ids(conn, self.text, fts=self.fts)
+        except sqlite3.OperationalError:
+            return  # запрос прерван более новым
+        finally:
+            conn.set_progress_handler(None, 0)
+            self.pool.release()
+        self.results_ready.emit(self.generation, ids)
+
+    def cancel(self):
+        self.cancelled = True
 
 
 class MainWindow(QMainWindow):
@@ -17,10 +84,20 @@ class MainWindow(QMainWindow):
 
         self.table_view = QTableView()
         self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Поиск по заголовку")
-        self.search_input.textChanged.connect(self.search_data)
+        self.search_input.setPlaceholderText("Поиск по заголовку и тексту")
+        self.search_input.textChanged.connect(self.schedule_search)
+
+        # Запрос уходит только после паузы в наборе текста
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_data)
+        self.search_generation = 0
+        self.search_threads = set()
 
         self.refresh_button = QPushButton("Обновить")
         self.refresh_button.clicked.connect(self.refresh_data)
@@ -31,6 +108,24 @@ class MainWindow(QMainWindow):
         self.delete_button = QPushButton("Удалить")
         self.delete_button.clicked.connect(self.delete_record)
 
+        self.paste_button = QPushButton("Вставить из буфера")
+        self.paste_button.clicked.connect(self.paste_records)
+
+        self.import_button = QPushButton("Импорт CSV")
+        self.import_button.clicked.connect(self.import_records)
+
+        # Пакетный режим: правки, удаления и новые строки копятся и
+        # записываются одной транзакцией по кнопке "Применить"
+        self.batch_button = QPushButton("Пакетный режим")
+        self.batch_button.setCheckable(True)
+        self.batch_button.toggled.connect(self.toggle_batch_mode)
+
+        self.submit_button = QPushButton("Применить")
+        self.submit_button.clicked.connect(self.submit_changes)
+
+        self.revert_button = QPushButton("Отменить")
+        self.revert_button.clicked.connect(self.revert_changes)
+
         layout = QVBoxLayout()
         layout.addWidget(self.search_input)
         layout.addWidget(self.table_view)
@@ -39,35 +134,66 @@ class MainWindow(QMainWindow):
         buttons_layout.addWidget(self.refresh_button)
         buttons_layout.addWidget(self.add_button)
         buttons_layout.addWidget(self.delete_button)
+        buttons_layout.addWidget(self.paste_button)
+        buttons_layout.addWidget(self.import_button)
+
+        batch_layout = QHBoxLayout()
+        batch_layout.addWidget(self.batch_button)
+        batch_layout.addWidget(self.submit_button)
+        batch_layout.addWidget(self.revert_button)
 
         layout.addLayout(buttons_layout)
+        layout.addLayout(batch_layout)
 
         container = QWidget()
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        self.model.dataChanged.connect(self.show_pending)
+        self.show_pending()
+
     # Подключение к базе
     def connect_to_db(self):
-        db = QSqlDatabase.addDatabase("QSQLITE")
-        db.setDatabaseName("Laba3.db")
-
-        if not db.open():
+        # Индексы для поиска создаются один раз; дальше их поддерживают триггеры
+        self.db = ConnectionPool(DB_NAME)
+        try:
+            self.fts = ensure_search(self.db.connection())
+        except sqlite3.Error:
             QMessageBox.critical(self, "Ошибка", "Не удалось подключиться к базе данных")
             sys.exit(1)
 
-        self.model = QSqlTableModel()
-        self.model.setTable("posts")
-        self.model.select()
+        # Строки читаются страницами по мере прокрутки, правки ячеек сразу пишутся в базу
+        self.model = PagedPostsModel(self.db, editable=True, parent=self)
 
     # Обновляем данные в таблице
     def refresh_data(self):
-        self.model.select()
+        self.model.refresh()
+        self.statusBar().showMessage(self.db.summary())
+
+    # Поиск по заголовку и тексту
+    def schedule_search(self):
+        self.search_timer.start()
 
-    # Поиск по заголовку
     def search_data(self):
-        search_text = self.search_input.text()
-        self.model.setFilter(f"title LIKE '%{search_text}%'")
-        self.model.select()
+        self.search_generation += 1
+        for thread in self.search_threads:
+            thread.cancel()
+        self.search_threads = {t for t in self.search_threads if not t.isFinished()}
+
+        search_text = self.search_input.text().strip()
+        if not search_text:
+            self.model.set_ranked_ids(None)
+            return
+
+        thread = SearchThread(self.db, self.search_generation, search_text, self.fts)
+        thread.results_ready.connect(self.show_search_results)
+        self.search_threads.add(thread)
+        thread.start()
+
+    def show_search_results(self, generation, ids):
+        if generation != self.search_generation:
+            return  # результат устаревшего запроса
+        self.model.set_ranked_ids(ids)
 
     # Ввод данных для добавления новой записи
     def add_record(self):
@@ -76,37 +202,128 @@ class MainWindow(QMainWindow):
         if user_id and title and body:
             print(f"user_id: {user_id}, title: {title}, body: {body}")
 
-            query = QSqlQuery()
-            query.prepare("INSERT INTO posts (user_id, title, body) VALUES (?, ?, ?)")
-
-            query.addBindValue(user_id)
-            query.addBindValue(title)
-            query.addBindValue(body)
-
-            if query.exec_():
+            if self.insert_records([(user_id, title, body)]) and not self.model.manual_submit:
                 QMessageBox.information(self, "Успех", "Запись успешно добавлена!")
-                self.model.select()
-            else:
-                error_message = query.lastError().text()
-                QMessageBox.critical(self, "Ошибка", f"Не удалось добавить запись: {error_message}")
         else:
             QMessageBox.warning(self, "Внимание", "Пожалуйста, заполните все поля")
 
 
-    # Удаление выбранной записи
+    # Новые строки: сразу одной транзакцией или в очередь пакетного режима
+    def insert_records(self, rows):
+        if self.model.manual_submit:
+            self.model.stage_insert(rows)
+            self.show_pending()
+            return True
+        try:
+            self.model.insert_rows(rows)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось добавить записи: {e}")
+            return False
+        self.statusBar().showMessage(f"Добавлено записей: {len(rows)}")
+        return True
+
+    def paste_records(self):
+        self.import_text(QApplication.clipboard().text())
+
+    def import_records(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт CSV", "", "CSV (*.csv);;Все файлы (*)")
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8", newline="") as f:
+                text = f.read()
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать файл: {e}")
+            return
+        self.import_text(text)
+
+    def import_text(self, text):
+        try:
+            rows = parse_rows(text)
+        except (ValueError, csv.Error) as e:
+            QMessageBox.warning(self, "Внимание", f"Не удалось разобрать строки: {e}")
+            return
+        if not rows:
+            QMessageBox.warning(self, "Внимание", "Нет строк для добавления")
+            return
+        self.insert_records(rows)
+
+    # Удаление выбранных записей
     def delete_record(self):
-        selected_index = self.table_view.currentIndex()
+        rows = sorted(index.row() for index in self.table_view.selectionModel().selectedRows())
+        if not rows and self.table_view.currentIndex().isValid():
+            rows = [self.table_view.currentIndex().row()]
 
-        if not selected_index.isValid():
+        if not rows:
             QMessageBox.warning(self, "Ошибка", "Выберите запись для удаления")
             return
 
-        reply = QMessageBox.question(self, "Подтверждение", "Вы уверены, что хотите удалить запись?",
+        if self.model.manual_submit:
+            self.model.stage_delete(rows)
+            self.table_view.clearSelection()
+            return
+
+        question = "Вы уверены, что хотите удалить запись?" if len(rows) == 1 else \
+            f"Вы уверены, что хотите удалить записи ({len(rows)})?"
+        reply = QMessageBox.question(self, "Подтверждение", question,
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            self.model.removeRow(selected_index.row())
-            self.model.select()
+            try:
+                self.model.delete_rows(rows)
+            except sqlite3.Error as e:
+                QMessageBox.critical(self, "Ошибка", f"Не удалось удалить записи: {e}")
+            self.table_view.clearSelection()
+
+    # Пакетный режим
+    def toggle_batch_mode(self, enabled):
+        if not enabled and self.model.has_pending() and not self.finish_pending():
+            self.batch_button.setChecked(True)
+            return
+        self.model.set_manual_submit(enabled)
+        self.show_pending()
+
+    def submit_changes(self):
+        try:
+            self.model.submit_all()
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Ошибка", f"Изменения не применены: {e}")
+            return False
+        self.show_pending()
+        self.statusBar().showMessage("Изменения применены")
+        return True
+
+    def revert_changes(self):
+        self.model.revert_all()
+        self.show_pending()
+
+    # Что делать с отложенными изменениями; False - остаться как есть
+    def finish_pending(self):
+        edits, deletes, inserts = self.model.pending_counts()
+        reply = QMessageBox.question(
+            self, "Несохранённые изменения",
+            f"Применить отложенные изменения (правок {edits}, удалений {deletes}, новых строк {inserts})?",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes)
+        if reply == QMessageBox.Yes:
+            return self.submit_changes()
+        if reply == QMessageBox.No:
+            self.revert_changes()
+            return True
+        return False
+
+    def show_pending(self, *args):
+        pending = self.model.has_pending()
+        self.submit_button.setEnabled(pending)
+        self.revert_button.setEnabled(pending)
+        if self.model.manual_submit:
+            edits, deletes, inserts = self.model.pending_counts()
+            self.statusBar().showMessage(f"Отложено: правок {edits}, удалений {deletes}, новых строк {inserts}")
+
+    def closeEvent(self, event):
+        if self.model.has_pending() and not self.finish_pending():
+            event.ignore()
+            return
+        super().closeEvent(event)
 
     # Форма для получения данных
     def get_input_data(self):
@@ -1,12 +1,24 @@
+import os
 import sys
 import asyncio
 import aiohttp
 import sqlite3
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QProgressBar,
-    QLabel, QTableWidget, QTableWidgetItem, QHBoxLayout, QMessageBox, QInputDialog
+    QLabel, QTableView, QHBoxLayout, QMessageBox, QInputDialog
 )
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer
+from PyQt5.QtCore import pyqtSignal, QTimer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.async_runtime import AsyncRuntime
+from common.db_pool import ConnectionPool
+from common.db_writer import DbWriter
+from common.http_cache import HttpCache
+from common.metrics import span
+from common.paged_model import PagedPostsModel
+from common.posts_db import BATCH_SIZE, LABA5_COLUMNS
+from common.posts_stream import IngestPipeline, StreamError, aiohttp_chunks, aiohttp_paged_chunks
 
 # Подключение к базе данных
 DB_PATH = 'Laba5.db'
@@ -15,56 +27,70 @@ TABLE_CREATION_QUERY = '''CREATE TABLE IF NOT EXISTS posts (
                             userId INTEGER, 
                             title TEXT, 
                             body TEXT)'''
-
-
-# Поток для загрузки данных
-class DataLoaderThread(QThread):
-    data_loaded_signal = pyqtSignal(list)
-
-    async def fetch_data(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://jsonplaceholder.typicode.com/posts") as response:
-                await asyncio.sleep(2)  # Задержка
-                return await response.json()
-
-    def run(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        data = loop.run_until_complete(self.fetch_data())
-        self.data_loaded_signal.emit(data)
-        loop.close()
-
-
-# Поток для сохранения данных
-class DataSaverThread(QThread):
-    progress_signal = pyqtSignal(int)
-    data_saved_signal = pyqtSignal()
-
-    def __init__(self, data):
-        super().__init__()
-        self.data = data
-
-    def run(self):
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(TABLE_CREATION_QUERY)
-
-        for index, post in enumerate(self.data):
-            cursor.execute("INSERT OR REPLACE INTO posts (id, userId, title, body) VALUES (?, ?, ?, ?)",
-                           (post['id'], post['userId'], post['title'], post['body']))
-            conn.commit()
-            self.progress_signal.emit(int((index + 1) / len(self.data) * 100))
-            QThread.msleep(50)  # Задержка
-
-        conn.close()
-        self.data_saved_signal.emit()
+POSTS_URL = "https://jsonplaceholder.typicode.com/posts"
+
+PAGE_SIZE = 0  # >0 - список забирается страницами ?_page=&_limit= параллельно
+
+# Общий HTTP-кэш: повторная проверка по таймеру стоит один ответ 304
+HTTP_CACHE = HttpCache()
+
+# Один цикл asyncio и одна сессия aiohttp на всё время работы приложения
+RUNTIME = AsyncRuntime()
+
+
+# Сохранение в фоновом потоке: разбор и запись идут одновременно с загрузкой
+def save_posts(pool, writer, pipeline, progress, batch_size=BATCH_SIZE):
+    conn = pool.connection()
+    try:
+        # Читает своё соединение, пишет общий писатель; одно обновление прогресса на пачку строк
+        pipeline.ingest(conn, LABA5_COLUMNS, batch_size=batch_size, sync=True, progress=progress, writer=writer)
+    finally:
+        pool.release()
+
+
+# Одна загрузка целиком (сеть + запись) как задача общего цикла asyncio;
+# куски ответа уходят в конвейер, не копясь в памяти
+async def load_posts(pool, writer, pipeline, skip_unchanged, progress, fetched):
+    with span("laba5.load"):
+        saving = asyncio.ensure_future(asyncio.to_thread(save_posts, pool, writer, pipeline, progress))
+        try:
+            if PAGE_SIZE:
+                chunks = aiohttp_paged_chunks(RUNTIME.session, POSTS_URL, pipeline.status, HTTP_CACHE, PAGE_SIZE,
+                                              RUNTIME.semaphore, skip_unchanged=skip_unchanged)
+            else:
+                chunks = aiohttp_chunks(RUNTIME.session, POSTS_URL, pipeline.status, HTTP_CACHE,
+                                        skip_unchanged=skip_unchanged)
+            async for chunk in chunks:
+                # Очередь ограничена: если запись отстаёт, загрузка ждёт
+                await pipeline.feed_async(chunk)
+        except asyncio.CancelledError:
+            pipeline.finish(StreamError("загрузка отменена"))  # поток записи не должен ждать вечно
+            raise
+        except BaseException as e:
+            # Любая ошибка загрузки (сеть, разбор страниц...) доходит до потока записи
+            # и возвращается через saving; без finish он ждал бы следующий кусок вечно
+            pipeline.finish(e)
+        else:
+            pipeline.finish()
+            fetched(pipeline.status.changed)
+        await saving  # ошибка загрузки или записи приходит отсюда
 
 
 # Главное окно приложения
 class AppWindow(QWidget):
+    progress_signal = pyqtSignal(int)
+    data_loaded_signal = pyqtSignal(bool)
+    load_finished_signal = pyqtSignal(object)
+    write_finished_signal = pyqtSignal(object, str)
+
     def __init__(self):
         super().__init__()
+        RUNTIME.start()
         self.init_ui()
+        self.progress_signal.connect(self.progress_bar.setValue)
+        self.data_loaded_signal.connect(self.on_data_loaded)
+        self.load_finished_signal.connect(self.on_load_finished)
+        self.write_finished_signal.connect(self.on_write_finished)
 
     def init_ui(self):
         self.layout = QVBoxLayout(self)
@@ -79,9 +105,18 @@ class AppWindow(QWidget):
         self.status_label = QLabel('Ожидание...', self)
         self.layout.addWidget(self.status_label)
 
-        self.data_table = QTableWidget(self)
-        self.data_table.setColumnCount(4)
-        self.data_table.setHorizontalHeaderLabels(['ID', 'User ID', 'Title', 'Body'])
+        # Одно соединение на поток на всё время работы; таблица создаётся один раз
+        self.db = ConnectionPool(DB_PATH)
+        with self.db.transaction() as conn:
+            conn.execute(TABLE_CREATION_QUERY)
+
+        # Все изменения базы идут через одного писателя, GUI на записи не блокируется
+        self.writer = DbWriter(self.db).start()
+
+        # Строки подгружаются страницами по мере прокрутки, а не все сразу
+        self.model = PagedPostsModel(self.db, LABA5_COLUMNS, ['ID', 'User ID', 'Title', 'Body'], parent=self)
+        self.data_table = QTableView(self)
+        self.data_table.setModel(self.model)
         self.layout.addWidget(self.data_table)
 
         # Добавление кнопок
@@ -99,41 +134,56 @@ class AppWindow(QWidget):
         self.timer.start(100000)  # каждые 100 секунд
 
     def load_data(self):
-        self.status_label.setText("Загрузка данных...")
-        self.progress_bar.setValue(0)
+        # Загрузка по таймеру, пока идёт предыдущая, не запускает вторую
+        future, started = RUNTIME.submit_coalesced("posts", self.start_load)
+        if started:
+            future.add_done_callback(self.load_finished_signal.emit)
 
-        # Поток для загрузки данных
-        self.loader_thread = DataLoaderThread()
-        self.loader_thread.data_loaded_signal.connect(self.on_data_loaded)
-        self.loader_thread.start()
-
-    def on_data_loaded(self, data):
-        self.status_label.setText("Данные загружены, сохранение в базу...")
+    def start_load(self):
+        self.status_label.setText("Загрузка данных...")
         self.progress_bar.setValue(0)
 
-        # Поток для сохранения данных
-        self.saver_thread = DataSaverThread(data)
-        self.saver_thread.data_saved_signal.connect(self.on_data_saved)
-        self.saver_thread.progress_signal.connect(self.progress_bar.setValue)  # Подключение сигнала
-        self.saver_thread.start()
-
+        # Загрузка и сохранение связаны конвейером и работают одновременно;
+        # если таблица уже заполнена, неизменившийся ответ не пишется повторно
+        self.pipeline = IngestPipeline()
+        return load_posts(self.db, self.writer, self.pipeline, self.model.rowCount() > 0,
+                          lambda p: self.progress_signal.emit(p.progress_percent()),
+                          self.data_loaded_signal.emit)
+
+    def on_data_loaded(self, changed):
+        if changed:
+            self.status_label.setText("Данные загружены, сохранение в базу...")
+
+    def on_load_finished(self, future):
+        if future.cancelled():
+            return  # приложение закрывается
+        error = future.exception()
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, StreamError, sqlite3.Error)):
+            self.on_data_error(str(error))
+        elif error is not None:
+            # Исключение из слота Qt роняет приложение - только сообщаем
+            self.on_data_error(f"{type(error).__name__}: {error}")
+        else:
+            self.progress_bar.setValue(100)
+            self.on_data_saved()
 
     def on_data_saved(self):
-        self.status_label.setText("Данные сохранены в базу.")
-        self.load_saved_data()
-
-    def load_saved_data(self):
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM posts")
-        rows = cursor.fetchall()
-        self.data_table.setRowCount(len(rows))
+        # Данные не изменились с прошлой загрузки - перечитывать нечего
+        if not self.pipeline.status.changed and self.pipeline.stats.inserted == 0:
+            self.status_label.setText(f"Данные не изменились ({HTTP_CACHE.summary()})")
+            return
+
+        # Синхронизация пишет только дельту; если строк не изменилось, таблицу не перечитываем
+        sync_stats = self.pipeline.sync_stats
+        self.status_label.setText(f"Данные сохранены в базу ({sync_stats}). {self.db.summary()}")
+        if sync_stats.changed or self.model.rowCount() == 0:
+            self.load_saved_data()
 
-        for row_index, row in enumerate(rows):
-            for col_index, value in enumerate(row):
-                self.data_table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
+    def on_data_error(self, message):
+        self.status_label.setText(f"Ошибка загрузки: {message}")
 
-        conn.close()
+    def load_saved_data(self):
+        self.model.refresh()
 
     def add_record(self):
         user_id, ok1 = QInputDialog.getText(self, "User ID", "Введите User ID:")
@@ -141,36 +191,43 @@ class AppWindow(QWidget):
         body, ok3 = QInputDialog.getText(self, "Body", "Введите Body:")
 
         if ok1 and ok2 and ok3:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute(TABLE_CREATION_QUERY)
-            cursor.execute("INSERT INTO posts (userId, title, body) VALUES (?, ?, ?)",
-                           (user_id, title, body))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Успех", "Запись успешно добавлена!")
-            self.load_saved_data()
+            future = self.writer.execute("INSERT INTO posts (userId, title, body) VALUES (?, ?, ?)",
+                                         (user_id, title, body))
+            future.add_done_callback(lambda f: self.write_finished_signal.emit(f, "Запись успешно добавлена!"))
 
     def delete_record(self):
-        current_row = self.data_table.currentRow()
+        current_row = self.data_table.currentIndex().row()
         if current_row >= 0:
-            post_id = self.data_table.item(current_row, 0).text()
+            post_id = self.model.post_id(current_row)
             reply = QMessageBox.question(
                 self, "Подтверждение удаления", f"Вы уверены, что хотите удалить запись ID {post_id}?",
                 QMessageBox.Yes | QMessageBox.No, QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                conn = sqlite3.connect(DB_PATH)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM posts WHERE id = ?", (post_id,))
-                conn.commit()
-                conn.close()
-                self.load_saved_data()
+                future = self.writer.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+                future.add_done_callback(lambda f: self.write_finished_signal.emit(f, ""))
+
+    def on_write_finished(self, future, message):
+        # Результат записи приходит после COMMIT, уже в потоке GUI
+        error = future.exception()
+        if error is not None:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить изменения: {error}")
+            return
+        if message:
+            QMessageBox.information(self, "Успех", message)
+        self.load_saved_data()
 
     def check_for_updates(self):
+        if RUNTIME.is_running("posts"):
+            return  # предыдущая загрузка ещё идёт
         self.status_label.setText("Проверка обновлений...")
         self.load_data()
 
+    def closeEvent(self, event):
+        RUNTIME.stop()
+        self.writer.stop()  # дописывает то, что уже в очереди
+        super().closeEvent(event)
+
 
 # Запуск приложения
 app = QApplication(sys.argv)
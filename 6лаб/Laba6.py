@@ -1,3 +1,4 @@
+import os
 import sys
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,6 +9,14 @@ from PyQt5.QtWidgets import (
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.metrics import span
+from csv_loader import load_csv
+from plot_pipeline import ChartRenderer
+from stats_engine import StatsEngine, aggregate, merge_aggregates
+from tasks import TaskScheduler
+
 class DataApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -15,6 +24,9 @@ class DataApp(QMainWindow):
         self.setGeometry(100, 100, 1200, 700)  # Увеличенное окно
         self.initUI()
         self.data = None  # Переменная для хранения данных
+        self.stats = None  # Накопительная статистика по self.data
+        # Загрузка, агрегаты и подготовка графиков идут в фоне, окно не замирает
+        self.tasks = TaskScheduler(parent=self)
     
     def initUI(self):
         # Основной макет
@@ -42,6 +54,7 @@ class DataApp(QMainWindow):
         self.figure = Figure(figsize=(10, 6))  # Изначальный размер фигуры
         self.plot_canvas = FigureCanvas(self.figure)
         self.ax = self.figure.add_subplot(111)
+        self.renderer = ChartRenderer(self.figure, self.ax)
         
         # Компоновка интерфейса
         self.layout.addWidget(self.load_button)
@@ -60,56 +73,49 @@ class DataApp(QMainWindow):
         # Открытие диалога для выбора файла
         file_path, _ = QFileDialog.getOpenFileName(self, "Open CSV File", "", "CSV Files (*.csv)")
         if file_path:
-            # Загрузка данных
-            self.data = pd.read_csv(file_path)
-            
-            # Отображение статистики
-            stats = f"Rows: {self.data.shape[0]}\nColumns: {self.data.shape[1]}\n\n"
-            stats += str(self.data.describe())
-            self.stats_field.setText(stats)
-            
-            # Построение графика
-            self.update_plot()
+            self.stats_field.setText(f"Loading {file_path}...")
+            self.tasks.cancel("plot")
+            self.tasks.submit("load", self.read_file, file_path,
+                              on_done=self.on_data_loaded, on_error=self.on_task_error)
+    
+    def read_file(self, token, file_path):
+        # Выполняется в фоне: загрузка кусками с компактными типами (повторно - из
+        # кэша колонок), затем агрегаты по частям таблицы, для больших - в процессах
+        with span("laba6.load_csv"):
+            data, load_stats = load_csv(file_path, progress=lambda rows: token.check())
+        with span("laba6.aggregate"):
+            parts = self.tasks.map_partitions(aggregate, data, token)
+            stats = StatsEngine(data, aggregates=merge_aggregates(parts) if parts else None)
+        return data, stats, load_stats
+    
+    def on_data_loaded(self, result):
+        self.data, self.stats, load_stats = result
+        self.stats_field.setText(f"{load_stats}\n\n{self.stats.report()}")
+        
+        # Построение графика
+        self.update_plot()
+    
+    def on_task_error(self, error):
+        self.stats_field.setText(f"Error: {error}")
     
     def update_plot(self):
         if self.data is None:
             return
         
-        self.ax.clear()  # Очистка предыдущего графика
-        graph_type = self.graph_type.currentText()
-        
-        if graph_type == "Line Chart":
-            if "Date" in self.data.columns and "Value1" in self.data.columns:
-                self.figure.set_size_inches(14, 6)  # Увеличение ширины фигуры
-                self.data["Date"] = pd.to_datetime(self.data["Date"])  # Преобразование даты
-                self.ax.plot(self.data["Date"], self.data["Value1"], label="Value1")
-                self.ax.set_title("Line Chart (Date vs Value1)")
-                self.ax.set_xlabel("Date")
-                self.ax.set_ylabel("Value1")
-                self.ax.tick_params(axis='x', rotation=45)  # Поворот меток оси X
-                self.figure.tight_layout()  # Автоматическое размещение элементов
-        
-        elif graph_type == "Histogram":
-            if "Date" in self.data.columns and "Value2" in self.data.columns:
-                self.figure.set_size_inches(10, 6)  # Вернуть стандартный размер
-                self.data["Date"] = pd.to_datetime(self.data["Date"])  # Преобразование даты
-                grouped_data = self.data.groupby("Date")["Value2"].sum()  # Группировка по дате
-                self.ax.bar(grouped_data.index, grouped_data.values, color='skyblue', edgecolor='black')
-                self.ax.set_title("Histogram (Date vs Value2)")
-                self.ax.set_xlabel("Date")
-                self.ax.set_ylabel("Sum of Value2")
-                self.ax.tick_params(axis='x', rotation=45)  # Поворот меток оси X
-                self.figure.tight_layout()
-        
-        elif graph_type == "Pie Chart":
-            if "Category" in self.data.columns:
-                self.figure.set_size_inches(10, 6)  # Вернуть стандартный размер
-                category_counts = self.data["Category"].value_counts()
-                self.ax.pie(category_counts, labels=category_counts.index, autopct='%1.1f%%', startangle=90)
-                self.ax.set_title("Pie Chart (Category)")
-        
-        self.ax.legend(loc='best')
-        self.plot_canvas.draw()
+        # Данные для графика готовятся в фоне (агрегаты из кэша, линия прорежена до
+        # ширины холста); смена типа графика отменяет ещё не готовый предыдущий
+        kind = self.graph_type.currentText()
+        self.tasks.submit("plot", self.prepare_plot, self.stats, kind, self.renderer.width(),
+                          on_done=lambda payload: self.draw_plot(kind, payload),
+                          on_error=self.on_task_error)
+
+    def prepare_plot(self, token, stats, kind, width):
+        with span("laba6.prepare_plot"):
+            return self.renderer.prepare(token, stats, kind, width)
+
+    def draw_plot(self, kind, payload):
+        with span("laba6.draw_plot"):
+            self.renderer.draw(kind, payload)
     
     def add_data(self):
         if self.data is None:
@@ -126,11 +132,16 @@ class DataApp(QMainWindow):
                 "Value2": float(new_row[2]),
                 "Category": new_row[3]
             }
-            self.data = pd.concat([self.data, pd.DataFrame([new_row_dict])], ignore_index=True)
-            self.stats_field.setText("Data added successfully!")
+            # Строка уходит в буфер, агрегаты обновляются за O(1)
+            self.stats.append(new_row_dict)
+            self.stats_field.setText(f"Data added successfully!\n\n{self.stats.report()}")
             self.update_plot()
         except (IndexError, ValueError):
             self.stats_field.setText("Invalid input format! Use: Date,Value1,Value2,Category")
+    
+    def closeEvent(self, event):
+        self.tasks.shutdown()
+        super().closeEvent(event)
 
 # Запуск приложения
 if __name__ == "__main__":
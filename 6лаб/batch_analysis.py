@@ -0,0 +1,180 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")  # без дисплея: графики сразу в PNG
+
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from csv_loader import load_csv
+from plot_pipeline import ChartRenderer, histogram_payload
+from stats_engine import StatsEngine, aggregate, describe, merge_aggregates
+
+# Пакетный анализ без GUI: та же статистика и те же три графика, что в
+# Laba6, но для многих CSV сразу. Файлы обрабатываются в пуле процессов,
+# каждый пишет свои stats (JSON или Parquet) и PNG, а частичные агрегаты
+# (Уэлфорд, скетчи квантилей, счётчики категорий, суммы по датам)
+# сливаются в общую сводку по всем файлам.
+
+CHARTS = (("Line Chart", "line"), ("Histogram", "histogram"), ("Pie Chart", "pie"))
+
+
+def find_inputs(patterns):
+    # Каталоги - все *.csv внутри, остальное - пути или glob-шаблоны
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, "*.csv"))))
+        else:
+            paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    return list(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+def output_names(paths):
+    # Имя файла без расширения; одинаковые имена из разных каталогов получают номер
+    names, seen = {}, {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names[path] = stem if seen[stem] == 1 else f"{stem}-{seen[stem]}"
+    return names
+
+
+def new_renderer():
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    return ChartRenderer(figure, figure.add_subplot(111), live=False)
+
+
+def stats_document(rows, running, sketches, category_counts, extra=None):
+    table = describe(running, sketches)
+    document = {
+        "rows": rows,
+        "describe": {column: table[column].to_dict() for column in table.columns},
+        "categories": dict(sorted(category_counts.items(), key=lambda item: -item[1])),
+    }
+    document.update(extra or {})
+    return document, table
+
+
+def write_stats(document, table, out_dir, name, fmt):
+    if fmt == "parquet":
+        frame = table.T
+        frame.index.name = "column"
+        frame.to_parquet(os.path.join(out_dir, f"{name}.stats.parquet"))
+    else:
+        with open(os.path.join(out_dir, f"{name}.stats.json"), "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2, default=str)
+
+
+def daily_sums(data):
+    if "Date" not in data.columns or "Value2" not in data.columns:
+        return pd.Series(dtype="float64")
+    return data.groupby("Date")["Value2"].sum().astype("float64")
+
+
+def analyze_file(path, out_dir, name, fmt="json", charts=True, columns=None):
+    # Выполняется в процессе пула; возвращает частичные агрегаты для сводки
+    started = time.perf_counter()
+    data, load_stats = load_csv(path, columns=columns, cache=None)
+    aggregates = aggregate(data)
+    running, sketches, category_counts = aggregates
+    document, table = stats_document(len(data), running, sketches, category_counts,
+                                     {"file": path, "load_seconds": round(load_stats.seconds, 3)})
+    write_stats(document, table, out_dir, name, fmt)
+
+    if charts:
+        engine = StatsEngine(data, aggregates=aggregates)
+        renderer = new_renderer()
+        for kind, suffix in CHARTS:
+            payload = renderer.prepare(None, engine, kind, renderer.width())
+            if payload is not None:
+                renderer.draw(kind, payload)
+                renderer.figure.savefig(os.path.join(out_dir, f"{name}.{suffix}.png"))
+
+    return {
+        "file": path,
+        "rows": len(data),
+        "aggregates": aggregates,
+        "daily": daily_sums(data),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def merge_results(results):
+    aggregates = merge_aggregates([result["aggregates"] for result in results])
+    daily = pd.concat([result["daily"] for result in results])
+    daily = daily.groupby(level=0).sum() if len(daily) else daily
+    return sum(result["rows"] for result in results), aggregates, daily
+
+
+def write_summary(results, failed, out_dir, fmt, charts):
+    rows, (running, sketches, category_counts), daily = merge_results(results)
+    document, table = stats_document(rows, running, sketches, category_counts, {
+        "files": len(results),
+        "failed": failed,
+    })
+    write_stats(document, table, out_dir, "summary", fmt)
+    if charts:
+        # Линию по сырым точкам между файлами не склеить - только суммы и категории
+        renderer = new_renderer()
+        if len(daily):
+            renderer.draw("Histogram", histogram_payload(daily, renderer.width()))
+            renderer.figure.savefig(os.path.join(out_dir, "summary.histogram.png"))
+        if category_counts:
+            counts = pd.Series(category_counts, dtype="int64").sort_values(ascending=False)
+            renderer.draw("Pie Chart", counts)
+            renderer.figure.savefig(os.path.join(out_dir, "summary.pie.png"))
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный анализ CSV без GUI")
+    parser.add_argument("inputs", nargs="+", help="CSV-файлы, каталоги или glob-шаблоны")
+    parser.add_argument("-o", "--out", default="analysis_output", help="каталог для результатов")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="число процессов")
+    parser.add_argument("--format", choices=("json", "parquet"), default="json")
+    parser.add_argument("--no-charts", action="store_true", help="не рисовать PNG")
+    parser.add_argument("--columns", nargs="+", help="читать только эти колонки")
+    args = parser.parse_args()
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("не найдено ни одного CSV")
+    os.makedirs(args.out, exist_ok=True)
+    names = output_names(paths)
+    charts = not args.no_charts
+
+    started = time.perf_counter()
+    results, failed = [], []
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(analyze_file, path, args.out, names[path], args.format, charts, args.columns): path
+                   for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed.append({"file": path, "error": str(e)})
+                print(f"[{done}/{len(paths)}] {path}: ошибка: {e}", file=sys.stderr)
+                continue
+            results.append(result)
+            print(f"[{done}/{len(paths)}] {path}: {result['rows']} строк за {result['seconds']:.2f} с")
+
+    if results:
+        summary = write_summary(results, failed, args.out, args.format, charts)
+        print(f"Итого: {summary['rows']} строк из {len(results)} файлов за {time.perf_counter() - started:.1f} с, "
+              f"результаты в {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+except ImportError:
+    feather = parquet = None
+
+# Загрузка больших CSV кусками с фиксированными типами: Category - category,
+# Date разбирается один раз при загрузке, числа ужимаются до минимального
+# типа. Можно читать только нужные колонки, а результат сохранить в
+# Feather/Parquet рядом с файлом - повторное открытие читает уже готовые
+# колонки (Feather - через отображение в память) без разбора текста.
+
+CHUNK_ROWS = 250_000
+CATEGORY_COLUMNS = ("Category",)
+DATE_COLUMNS = ("Date",)
+CACHE_DIR = ".csv_cache"
+CACHE_FORMATS = ("feather", "parquet")
+
+
+def peak_rss_mb():
+    # Пик резидентной памяти процесса (на Linux ru_maxrss в КиБ)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoadStats:
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.rows = 0
+        self.columns = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.memory_mb = 0.0
+        self.peak_rss_mb = None
+
+    def __str__(self):
+        lines = [
+            f"Source: {self.source}",
+            f"Load time: {self.seconds:.2f} s ({self.chunks} chunks)" if self.chunks else
+            f"Load time: {self.seconds:.2f} s",
+            f"Frame memory: {self.memory_mb:.1f} MB",
+        ]
+        if self.peak_rss_mb is not None:
+            lines.append(f"Peak RSS: {self.peak_rss_mb:.1f} MB")
+        return "\n".join(lines)
+
+
+def shrink(chunk, downcast_floats=True):
+    # Приводит кусок к компактным типам; вызывается для каждого куска отдельно
+    for column in chunk.columns:
+        values = chunk[column]
+        if column in DATE_COLUMNS:
+            chunk[column] = pd.to_datetime(values, errors="coerce")
+        elif column in CATEGORY_COLUMNS:
+            chunk[column] = values.astype("category")
+        elif pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            chunk[column] = pd.to_numeric(values, downcast="integer")
+        elif downcast_floats and pd.api.types.is_float_dtype(values):
+            chunk[column] = pd.to_numeric(values, downcast="float")
+    return chunk
+
+
+def combine(chunks):
+    # Склеивает куски по колонкам; категории объединяются без перехода в object
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[column] = pd.Series(union_categoricals(parts, ignore_order=True), name=column)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def cache_path(path, columns, fmt):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{columns}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    name = f"{os.path.basename(path)}.{digest}.{fmt}"
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, name)
+
+
+def read_cache(path, fmt):
+    if fmt == "feather":
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return parquet.read_table(path).to_pandas()
+
+
+def write_cache(frame, path, fmt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    if fmt == "feather":
+        # Без сжатия, чтобы файл можно было отобразить в память
+        feather.write_feather(frame, temp_path, compression="uncompressed")
+    else:
+        frame.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def read_chunks(path, columns=None, chunk_rows=CHUNK_ROWS, downcast_floats=True, progress=None):
+    # Генератор типизированных кусков; progress(прочитано строк) после каждого
+    rows = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows,
+                             dtype={name: "category" for name in CATEGORY_COLUMNS}):
+        chunk = shrink(chunk, downcast_floats)
+        rows += len(chunk)
+        if progress is not None:
+            progress(rows)
+        yield chunk
+
+
+def load_csv(path, columns=None, chunk_rows=CHUNK_ROWS, cache="feather", downcast_floats=True, progress=None):
+    # Возвращает (DataFrame, LoadStats); cache=None отключает кэш колонок
+    if cache is not None and (cache not in CACHE_FORMATS or feather is None):
+        cache = None
+    columns = list(columns) if columns else None
+    started = time.perf_counter()
+
+    cached = cache_path(path, columns, cache) if cache else None
+    if cached and os.path.exists(cached):
+        frame = read_cache(cached, cache)
+        stats = LoadStats(path, f"{cache} cache")
+    else:
+        chunks = list(read_chunks(path, columns, chunk_rows, downcast_floats, progress))
+        frame = combine(chunks)
+        stats = LoadStats(path, "csv")
+        stats.chunks = len(chunks)
+        del chunks
+        if cached:
+            write_cache(frame, cached, cache)
+
+    stats.seconds = time.perf_counter() - started
+    stats.rows, stats.columns = frame.shape
+    stats.memory_mb = frame.memory_usage(deep=True).sum() / 2 ** 20
+    stats.peak_rss_mb = peak_rss_mb()
+    return frame, stats
@@ -0,0 +1,205 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from matplotlib import dates as mdates
+
+# Отрисовка графиков Laba6 без пересчёта на каждый кадр: разобранные даты и
+# агрегаты для каждого типа графика кэшируются по версии данных StatsEngine,
+# линия прореживается до ширины осей в пикселях (min/max или LTTB), а при
+# повторной отрисовке того же графика обновляются данные существующих
+# объектов (set_data), а не пересоздаётся всё через ax.clear().
+
+DEFAULT_WIDTH = 1000
+BAR_LIMIT = 200  # больше столбцов рисуем одной ступенчатой фигурой, а не патчем на столбец
+DECIMATION = ("minmax", "lttb")
+
+
+def minmax_downsample(x, y, buckets):
+    # Для каждой корзины подряд идущих точек оставляет минимум и максимум,
+    # поэтому пики не пропадают; результат - не больше 2 * buckets точек
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.full(size * buckets, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    low = np.where(np.isnan(padded), np.inf, padded).argmin(axis=1) + offsets
+    high = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1) + offsets
+    index = np.unique(np.concatenate([low, high]))
+    index = index[index < n]
+    return x[index], y[index]
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: в каждой корзине точка, образующая
+    # наибольший треугольник с предыдущей выбранной и средним следующей корзины
+    n = len(y)
+    if threshold < 3 or n <= threshold:
+        return x, y
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    index = np.empty(threshold, dtype="int64")
+    index[0], index[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = np.nanmean(y[end:next_end]) if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + (int(np.nanargmax(area)) if end > start and not np.isnan(area).all() else 0)
+        index[i + 1] = a
+    return x[index], y[index]
+
+
+def decimate(x, y, width, method="minmax"):
+    # Не больше одной точки на пиксель ширины: больше Agg всё равно не покажет
+    if method == "lttb":
+        return lttb(x, y, width)
+    return minmax_downsample(x, y, width // 2)
+
+
+def bin_sums(series, bins):
+    # Суммы по датам, сведённые в bins равных интервалов времени
+    edges = pd.date_range(series.index.min(), series.index.max(), periods=bins + 1)
+    binned = series.groupby(pd.cut(series.index, edges, include_lowest=True), observed=False).sum()
+    return pd.Series(binned.to_numpy(), index=edges[:-1]), (edges[1] - edges[0]) / pd.Timedelta(days=1)
+
+
+def histogram_payload(sums, width):
+    # (суммы, ширина столбца в днях); дат больше, чем пикселей, - сводим в интервалы
+    if len(sums) > width:
+        return bin_sums(sums, width)
+    return sums, 0.8
+
+
+class PlotCache:
+    # Значения живут, пока не сменился движок или его версия; заполняется и
+    # из фоновых задач, поэтому расчёт идёт без блокировки, а запись - под ней
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.engine = None
+        self.version = None
+        self.values = {}
+
+    def get(self, engine, name, compute):
+        version = engine.version
+        with self.lock:
+            if engine is not self.engine or version != self.version:
+                self.engine, self.version, self.values = engine, version, {}
+            if name in self.values:
+                return self.values[name]
+        value = compute()
+        with self.lock:
+            if engine is self.engine and version == self.version:
+                self.values[name] = value
+        return value
+
+
+class ChartRenderer:
+    # prepare() только считает и может работать в фоновом потоке,
+    # draw() трогает объекты matplotlib и вызывается в потоке GUI
+    def __init__(self, figure, ax, method="minmax", live=True):
+        self.figure = figure
+        self.ax = ax
+        self.method = method
+        self.live = live  # False - без draw_idle, кадр рисует savefig
+        self.cache = PlotCache()
+        self.kind = None
+        self.artist = None
+
+    def width(self):
+        width = int(self.ax.bbox.width)
+        return width if width > 0 else DEFAULT_WIDTH
+
+    def render(self, engine, kind):
+        self.draw(kind, self.prepare(None, engine, kind, self.width()))
+
+    def prepare(self, token, engine, kind, width):
+        # Сигнатура как у задач TaskScheduler: первым идёт токен отмены (или None)
+        columns = engine.data.columns
+        if kind == "Line Chart" and "Date" in columns and "Value1" in columns:
+            return self.line_points(engine, width, token)
+        if kind == "Histogram" and "Date" in columns and "Value2" in columns:
+            return self.daily_sums(engine, width)
+        if kind == "Pie Chart" and "Category" in columns:
+            return self.cache.get(engine, "categories", engine.category_series)
+        return None
+
+    def draw(self, kind, payload):
+        if kind != self.kind:
+            self.ax.clear()  # только при смене типа графика
+            self.kind, self.artist = kind, None
+        if payload is not None:
+            if kind == "Line Chart":
+                self.draw_line(*payload)
+            elif kind == "Histogram":
+                self.draw_histogram(*payload)
+            elif kind == "Pie Chart":
+                self.draw_pie(payload)
+        if self.live:
+            self.figure.canvas.draw_idle()
+
+    def line_points(self, engine, width, token=None):
+        def compute():
+            x = mdates.date2num(engine.column("Date"))
+            return x, engine.column("Value1").astype("float64")
+
+        x, y = self.cache.get(engine, "line", compute)
+        if token is not None:
+            token.check()
+        return self.cache.get(engine, ("line", width, self.method), lambda: decimate(x, y, width, self.method))
+
+    def draw_line(self, x, y):
+        if self.artist is None:
+            self.figure.set_size_inches(14, 6)  # Увеличение ширины фигуры
+            self.artist, = self.ax.plot(x, y, label="Value1")
+            self.ax.xaxis_date()
+            self.ax.set_title("Line Chart (Date vs Value1)")
+            self.ax.set_xlabel("Date")
+            self.ax.set_ylabel("Value1")
+            self.ax.tick_params(axis='x', rotation=45)  # Поворот меток оси X
+            self.ax.legend(loc='best')
+            self.figure.tight_layout()
+        else:
+            self.artist.set_data(x, y)
+            self.ax.relim()
+            self.ax.autoscale_view()
+
+    def daily_sums(self, engine, width):
+        def compute():
+            # Колонки читаются вместе с буфером, движок при этом не меняется
+            values = pd.Series(engine.column("Value2"), index=pd.DatetimeIndex(engine.column("Date")))
+            return histogram_payload(values.groupby(level=0).sum(), width)
+
+        return self.cache.get(engine, ("daily", width), compute)
+
+    def draw_histogram(self, sums, bar_width):
+        if self.artist is not None:
+            self.artist.remove()
+        else:
+            self.figure.set_size_inches(10, 6)  # Вернуть стандартный размер
+            self.ax.set_title("Histogram (Date vs Value2)")
+            self.ax.set_xlabel("Date")
+            self.ax.set_ylabel("Sum of Value2")
+            self.ax.tick_params(axis='x', rotation=45)  # Поворот меток оси X
+        if len(sums) > BAR_LIMIT:
+            start = mdates.date2num(sums.index)
+            edges = np.append(start, start[-1] + bar_width)
+            self.artist = self.ax.stairs(sums.to_numpy(), edges, fill=True, color='skyblue', edgecolor='black')
+            self.ax.xaxis_date()
+        else:
+            self.artist = self.ax.bar(sums.index, sums.values, width=bar_width, color='skyblue', edgecolor='black')
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.figure.tight_layout()
+
+    def draw_pie(self, counts):
+        # Секторов немного - их проще построить заново
+        self.ax.clear()
+        self.figure.set_size_inches(10, 6)  # Вернуть стандартный размер
+        self.ax.pie(counts, labels=counts.index, autopct='%1.1f%%', startangle=90)
+        self.ax.set_title("Pie Chart (Category)")
@@ -0,0 +1,270 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from csv_loader import CATEGORY_COLUMNS, DATE_COLUMNS, combine
+
+# Статистика, которая обновляется по одной строке за O(1): count/mean/var по
+# Уэлфорду, min/max, приближённые квантили через логарифмический скетч и
+# счётчики категорий. Новые строки копятся в буфере и вливаются в DataFrame
+# пачками, а не через pd.concat на каждую строку.
+
+APPEND_BATCH = 256
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_values(cls, values):
+        stats = cls()
+        if len(values):
+            stats.count = len(values)
+            stats.mean = float(values.mean())
+            stats.m2 = float(((values - stats.mean) ** 2).sum())
+            stats.min = float(values.min())
+            stats.max = float(values.max())
+        return stats
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        # Формула Чана для объединения двух частичных агрегатов
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def var(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.var) if self.count > 1 else math.nan
+
+
+class QuantileSketch:
+    # Логарифмические корзины (в духе DDSketch): относительная ошибка квантиля
+    # не больше relative_accuracy, обновление и слияние за O(1) на корзину
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def add(self, value, weight=1):
+        if value > 0:
+            key = self.key(value)
+            self.positive[key] = self.positive.get(key, 0) + weight
+        elif value < 0:
+            key = self.key(-value)
+            self.negative[key] = self.negative.get(key, 0) + weight
+        else:
+            self.zeros += weight
+        self.count += weight
+
+    def add_values(self, values):
+        # Векторное заполнение при загрузке файла
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        for target, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            keys, counts = np.unique(np.ceil(np.log(part) / self.log_gamma).astype("int64"), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                target[key] = target.get(key, 0) + count
+        self.zeros += int((values == 0).sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        for target, source in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self.value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self.value(key)
+        return self.value(max(self.positive))
+
+
+def numeric_columns(data):
+    return [c for c in data.columns
+            if pd.api.types.is_numeric_dtype(data[c]) and not pd.api.types.is_bool_dtype(data[c])]
+
+
+def aggregate(data, category_column=CATEGORY_COLUMNS[0]):
+    # Частичные агрегаты куска данных: (running, sketches, category_counts).
+    # Функция верхнего уровня, чтобы её можно было выполнять в пуле процессов
+    running, sketches = {}, {}
+    for column in numeric_columns(data):
+        values = data[column].dropna().to_numpy(dtype="float64")
+        running[column] = RunningStats.from_values(values)
+        sketches[column] = QuantileSketch()
+        sketches[column].add_values(values)
+    category_counts = {}
+    if category_column in data.columns:
+        counts = data[category_column].value_counts()
+        category_counts = {k: int(v) for k, v in counts.items() if v}
+    return running, sketches, category_counts
+
+
+def merge_aggregates(parts):
+    running, sketches, category_counts = parts[0]
+    for part_running, part_sketches, part_counts in parts[1:]:
+        # У файлов могут быть разные числовые колонки: новые просто добавляются
+        for column, stats in part_running.items():
+            if column in running:
+                running[column].merge(stats)
+                sketches[column].merge(part_sketches[column])
+            else:
+                running[column] = stats
+                sketches[column] = part_sketches[column]
+        for key, count in part_counts.items():
+            category_counts[key] = category_counts.get(key, 0) + count
+    return running, sketches, category_counts
+
+
+def describe(running, sketches):
+    # Та же таблица, что DataFrame.describe() для числовых колонок
+    table = {}
+    for column, stats in running.items():
+        sketch = sketches[column]
+        quantiles = [min(max(sketch.quantile(q), stats.min), stats.max) for q in QUANTILES]
+        table[column] = [stats.count, stats.mean, stats.std, stats.min, *quantiles, stats.max]
+    index = ["count", "mean", "std", "min"] + [f"{q:.0%}" for q in QUANTILES] + ["max"]
+    return pd.DataFrame(table, index=index)
+
+
+class StatsEngine:
+    def __init__(self, data, category_column=CATEGORY_COLUMNS[0], batch_rows=APPEND_BATCH, aggregates=None):
+        self.category_column = category_column
+        self.batch_rows = batch_rows
+        # Строки добавляются в потоке GUI, а читаются и фоновыми задачами
+        self.lock = threading.Lock()
+        self.reset(data, aggregates)
+
+    def reset(self, data, aggregates=None):
+        # Единственный полный проход - при загрузке файла; aggregates можно
+        # посчитать заранее по частям (merge_aggregates) и передать готовыми
+        self.data = data
+        self.pending = []
+        self.version = 0
+        self.numeric = numeric_columns(data)
+        if aggregates is None:
+            aggregates = aggregate(data, self.category_column)
+        self.running, self.sketches, self.category_counts = aggregates
+
+    @property
+    def rows(self):
+        return len(self.data) + len(self.pending)
+
+    def append(self, row):
+        # row - словарь колонка -> значение; дата проверяется до изменения агрегатов
+        row = dict(row)
+        for column in DATE_COLUMNS:
+            if column in row:
+                row[column] = pd.Timestamp(row[column])
+        for column in self.numeric:
+            value = row.get(column)
+            if value is not None and not math.isnan(value):
+                self.running[column].add(value)
+                self.sketches[column].add(value)
+        category = row.get(self.category_column)
+        with self.lock:
+            if category is not None:
+                self.category_counts[category] = self.category_counts.get(category, 0) + 1
+            self.pending.append(row)
+            self.version += 1
+        if len(self.pending) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        # Вливает буфер в DataFrame одной склейкой на пачку
+        with self.lock:
+            if not self.pending:
+                return self.data
+            tail = pd.DataFrame(self.pending, columns=self.data.columns)
+            for column in CATEGORY_COLUMNS:
+                if column in tail.columns:
+                    tail[column] = tail[column].astype("category")
+            self.data = combine([self.data, tail])
+            self.pending = []
+            return self.data
+
+    def frame(self):
+        return self.flush()
+
+    def column(self, name):
+        # Значения колонки вместе с буфером, без склейки всего DataFrame
+        with self.lock:
+            data, pending = self.data, list(self.pending)
+        values = data[name].to_numpy()
+        if not pending:
+            return values
+        tail = np.array([row.get(name) for row in pending], dtype=values.dtype
+                        if values.dtype.kind in "fM" else None)
+        return np.concatenate([values, tail])
+
+    def category_series(self):
+        with self.lock:
+            counts = dict(self.category_counts)
+        return pd.Series(counts, dtype="int64").sort_values(ascending=False)
+
+    def describe(self):
+        return describe(self.running, self.sketches)
+
+    def report(self):
+        text = f"Rows: {self.rows}\nColumns: {len(self.data.columns)}\n\n{self.describe()}"
+        if self.category_counts:
+            counts = ", ".join(f"{k}: {v}" for k, v in self.category_series().items())
+            text += f"\n\n{self.category_column}: {counts}"
+        return text
@@ -0,0 +1,154 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Фоновые задачи Laba6: тяжёлая работа (разбор CSV, агрегаты, подготовка
+# графиков) идёт в QThreadPool, результат возвращается сигналом в поток GUI.
+# Задачи разбиты по каналам: новая задача в канале отменяет предыдущую, и
+# результат устаревшей задачи в интерфейс уже не попадает. Для CPU-ёмких
+# агрегатов по большим таблицам есть пул процессов (map_partitions).
+
+PROCESS_MIN_ROWS = 2_000_000  # меньшие таблицы дешевле посчитать, чем передать в процессы
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def check(self):
+        if self.event.is_set():
+            raise Cancelled()
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+
+class Task(QRunnable):
+    def __init__(self, job_id, token, signals, func, args):
+        super().__init__()
+        self.job_id = job_id
+        self.token = token
+        self.signals = signals
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            self.token.check()
+            result = self.func(self.token, *self.args)
+            self.token.check()
+        except BaseException as e:
+            self.signals.failed.emit(self.job_id, e)
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class TaskScheduler(QObject):
+    def __init__(self, max_threads=None, processes=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.next_id = 0
+        self.current = {}  # канал -> (id задачи, токен)
+        self.callbacks = {}  # id задачи -> (канал, on_done, on_error)
+        self.signals = TaskSignals()
+        self.signals.finished.connect(self.on_finished)
+        self.signals.failed.connect(self.on_failed)
+
+    def submit(self, channel, func, *args, on_done=None, on_error=None):
+        # func(token, *args) выполняется в пуле потоков; вызывать из потока GUI
+        self.cancel(channel)
+        self.next_id += 1
+        token = CancelToken()
+        self.current[channel] = (self.next_id, token)
+        self.callbacks[self.next_id] = (channel, on_done, on_error)
+        self.pool.start(Task(self.next_id, token, self.signals, func, args))
+        return token
+
+    def cancel(self, channel):
+        job = self.current.pop(channel, None)
+        if job is not None:
+            job[1].cancel()
+
+    def is_busy(self, channel):
+        return channel in self.current
+
+    def take_callbacks(self, job_id):
+        # Колбэки задачи, если она всё ещё последняя в своём канале
+        channel, on_done, on_error = self.callbacks.pop(job_id)
+        job = self.current.get(channel)
+        if job is None or job[0] != job_id:
+            return None
+        del self.current[channel]
+        return on_done, on_error
+
+    def on_finished(self, job_id, result):
+        callbacks = self.take_callbacks(job_id)
+        if callbacks is not None and callbacks[0] is not None:
+            callbacks[0](result)
+
+    def on_failed(self, job_id, error):
+        callbacks = self.take_callbacks(job_id)
+        if callbacks is not None and callbacks[1] is not None and not isinstance(error, Cancelled):
+            callbacks[1](error)
+
+    # --- пул процессов ---
+
+    def process_pool(self):
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.processes)
+            return self.executor
+
+    def map_partitions(self, func, frame, token=None, partitions=None):
+        # func(часть) по частям таблицы; в процессах, если таблица большая.
+        # Вызывается из фоновой задачи, возвращает список результатов по порядку
+        partitions = partitions or self.processes
+        bounds = np.linspace(0, len(frame), partitions + 1).astype("int64")
+        parts = [frame.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        if self.processes <= 1 or len(parts) <= 1 or len(frame) < PROCESS_MIN_ROWS:
+            results = []
+            for part in parts:
+                if token is not None:
+                    token.check()
+                results.append(func(part))
+            return results
+        futures = [self.process_pool().submit(func, part) for part in parts]
+        try:
+            pending = set(futures)
+            while pending:
+                if token is not None:
+                    token.check()
+                _, pending = wait(pending, timeout=0.05)
+            return [future.result() for future in futures]
+        except Cancelled:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def shutdown(self):
+        for channel in list(self.current):
+            self.cancel(channel)
+        self.pool.waitForDone()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
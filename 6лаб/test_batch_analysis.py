@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_analysis import analyze_file, merge_results, write_summary
+
+# Сводка по файлам с разными числовыми колонками: у каждого своя колонка
+# помимо общей Value1, и ни одна не должна потеряться при слиянии
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_summary_merges_different_columns(tmp_path):
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    write(first, "Date,Category,Value1,Value2\n2024-01-01,A,1,10\n2024-01-02,B,2,20\n")
+    write(second, "Date,Category,Value1,Value3\n2024-01-01,A,3,300\n2024-01-03,C,4,400\n")
+    results = [analyze_file(str(path), str(tmp_path), path.stem, charts=False) for path in (first, second)]
+
+    rows, (running, sketches, category_counts), daily = merge_results(results)
+
+    assert rows == 4
+    assert set(running) == set(sketches) == {"Value1", "Value2", "Value3"}
+    assert running["Value1"].count == 4
+    assert running["Value1"].mean == 2.5
+    assert running["Value2"].count == 2
+    assert running["Value3"].max == 400
+    assert category_counts == {"A": 2, "B": 1, "C": 1}
+
+    write_summary(results, [], str(tmp_path), "json", charts=False)
+    with open(tmp_path / "summary.stats.json", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["rows"] == 4
+    assert set(summary["describe"]) == {"Value1", "Value2", "Value3"}
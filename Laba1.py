@@ -1,23 +1,25 @@
-import requests
+from common.http_cache import HttpCache
+from common.posts_api import PostsClient
+from common.posts_store import PostsStore
+
+client = PostsClient(cache=HttpCache())
 
 #GET-запрос
-url = "https://jsonplaceholder.typicode.com/posts"
-posts = requests.get(url)
-posts_json = posts.json()
-for i in posts_json:
-    if (i["userId"] % 2 == 0):
-        print(i, "\n")
+# Посты хранятся колонками, фильтр по чётности userId считается векторно
+posts = PostsStore.from_dicts(client.get_posts())
+for post in posts.select(posts.user_parity(even=True)):
+    print(post.to_dict(), "\n")
 
 #POST-запрос
 new_data = {
 "title": 'Тестовый пост',
 }
-post_response = requests.post(url, json=new_data)
-print(post_response.json())
+print(client.create_post(new_data))
 
 #PUT-запрос
 updated_data= {
 "title": 'Обновленный пост'
 }
-posts_put_response = requests.put(f"{url}/100", json=updated_data)
-print(posts_put_response.json())
\ No newline at end of file
+print(client.update_post(100, updated_data))
+
+client.close()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from datagen import write_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "6лаб"))
+
+# Загрузка большого CSV: pd.read_csv без типов (как было в Laba6) против
+# кусковой загрузки с типами и повторного открытия из кэша Feather/Parquet.
+# Каждый вариант запускается в отдельном процессе, чтобы пик RSS был честным.
+
+RUN = """
+import sys, time
+sys.path.append({lab!r})
+import pandas as pd
+from csv_loader import load_csv, peak_rss_mb
+started = time.perf_counter()
+if {mode!r} == "read_csv":
+    frame = pd.read_csv({path!r})
+else:
+    frame, _ = load_csv({path!r}, cache={cache!r})
+seconds = time.perf_counter() - started
+print(f"{{seconds:.2f}} {{frame.memory_usage(deep=True).sum() / 2 ** 20:.1f}} {{peak_rss_mb():.1f}}")
+"""
+
+
+def run(mode, path, cache=None):
+    code = RUN.format(lab=os.path.join(ROOT, "6лаб"), mode=mode, path=path, cache=cache)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return map(float, output.split())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--cache", default="feather", choices=("feather", "parquet"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        write_csv(path, args.rows)
+        print(f"{args.rows} строк, {os.path.getsize(path) / 2 ** 20:.0f} МБ CSV")
+        print(f"{'вариант':<26} {'время, с':>9} {'кадр, МБ':>9} {'пик RSS, МБ':>12}")
+        for label, mode, cache in (("pd.read_csv", "read_csv", None),
+                                   ("load_csv без кэша", "load_csv", None),
+                                   ("load_csv + запись кэша", "load_csv", args.cache),
+                                   ("load_csv из кэша", "load_csv", args.cache)):
+            seconds, frame_mb, rss_mb = run(mode, path, cache)
+            print(f"{label:<26} {seconds:>9.2f} {frame_mb:>9.1f} {rss_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
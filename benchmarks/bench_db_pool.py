@@ -0,0 +1,105 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.posts_db import bulk_insert, configure
+
+# Запросы по одному: новое соединение + CREATE TABLE на каждую операцию
+# (как было в add_record/delete_record Laba5) против пула соединений,
+# и параллельное чтение из нескольких потоков во время записи под WAL
+
+TABLE = "CREATE TABLE IF NOT EXISTS posts (id INTEGER PRIMARY KEY, userId INTEGER, title TEXT, body TEXT)"
+INSERT = "INSERT INTO posts (userId, title, body) VALUES (?, ?, ?)"
+SELECT = "SELECT id, userId, title, body FROM posts WHERE id > ? ORDER BY id LIMIT 50"
+
+
+def per_call(path, ops):
+    for i in range(ops):
+        conn = sqlite3.connect(path)
+        conn.execute(TABLE)
+        if i % 2:
+            conn.execute(SELECT, (i,)).fetchall()
+        else:
+            conn.execute(INSERT, (i, "title", "body"))
+            conn.commit()
+        conn.close()
+
+
+def pooled(pool, ops):
+    for i in range(ops):
+        if i % 2:
+            pool.query(SELECT, (i,))
+        else:
+            with pool.transaction() as conn:
+                conn.execute(INSERT, (i, "title", "body"))
+
+
+def concurrent_reads(pool, readers, duration):
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def read(slot):
+        while not stop.is_set():
+            pool.query(SELECT, (counts[slot] % 1000,))
+            counts[slot] += 1
+        pool.release()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            with pool.transaction() as conn:
+                conn.executemany(INSERT, ((i, "title", "body") for _ in range(100)))
+            i += 1
+        pool.release()
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pool.db")
+        conn = configure(sqlite3.connect(path))
+        conn.execute(TABLE)
+        bulk_insert(conn, ((i, i % 10, "title", "body") for i in range(1, 10_001)), ("id", "userId", "title", "body"))
+        conn.close()
+
+        started = time.perf_counter()
+        per_call(path, args.ops)
+        elapsed = time.perf_counter() - started
+        print(f"{'соединение на операцию':<26} {elapsed / args.ops * 1e6:>9.1f} мкс/операция")
+
+        pool = ConnectionPool(path)
+        started = time.perf_counter()
+        pooled(pool, args.ops)
+        elapsed = time.perf_counter() - started
+        print(f"{'пул соединений':<26} {elapsed / args.ops * 1e6:>9.1f} мкс/операция")
+        print(pool.summary())
+
+        reads = concurrent_reads(pool, args.readers, args.duration)
+        print(f"{args.readers} читателя при активной записи: {reads / args.duration:.0f} запросов/с")
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
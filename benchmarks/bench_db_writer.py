@@ -0,0 +1,114 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.db_writer import DbWriter
+from common.posts_db import configure
+
+# Одиночные записи из нескольких потоков: транзакция на каждую операцию
+# (with conn: через общую блокировку) против общего писателя, который
+# собирает всё накопившееся за такт в одну транзакцию. Плюс задержка
+# чтения, пока идёт запись
+
+TABLE = "CREATE TABLE IF NOT EXISTS posts (id INTEGER PRIMARY KEY, userId INTEGER, title TEXT, body TEXT)"
+INSERT = "INSERT INTO posts (userId, title, body) VALUES (?, ?, ?)"
+SELECT = "SELECT id, userId, title, body FROM posts WHERE id > ? ORDER BY id LIMIT 50"
+
+
+def run_threads(threads, ops, work):
+    def run(slot):
+        for i in range(ops):
+            work(slot, i)
+
+    workers = [threading.Thread(target=run, args=(slot,)) for slot in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def per_transaction(pool, threads, ops):
+    def work(slot, i):
+        with pool.transaction() as conn:
+            conn.execute(INSERT, (slot, "title", "body"))
+
+    return run_threads(threads, ops, work)
+
+
+def via_writer(writer, threads, ops):
+    # Как GUI: операция ставится в очередь, результат ждём только в конце
+    futures = [[] for _ in range(threads)]
+
+    def work(slot, i):
+        futures[slot].append(writer.execute(INSERT, (slot, "title", "body")))
+
+    started = time.perf_counter()
+    run_threads(threads, ops, work)
+    for slot_futures in futures:
+        for future in slot_futures:
+            future.result()
+    return time.perf_counter() - started
+
+
+def read_latency(pool, writer, reads):
+    # Чтение из потока GUI, пока писатель занят потоком вставок
+    stop = threading.Event()
+
+    def write():
+        while not stop.is_set():
+            writer.executemany(INSERT, ((0, "title", "body") for _ in range(500))).result()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    worst = total = 0.0
+    for i in range(reads):
+        started = time.perf_counter()
+        pool.query(SELECT, (i,))
+        elapsed = time.perf_counter() - started
+        total += elapsed
+        worst = max(worst, elapsed)
+    stop.set()
+    thread.join()
+    return total / reads, worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=500, help="операций на поток")
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+    total = args.threads * args.ops
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "writer.db")
+        conn = configure(sqlite3.connect(path))
+        conn.execute(TABLE)
+        conn.close()
+
+        pool = ConnectionPool(path)
+        elapsed = per_transaction(pool, args.threads, args.ops)
+        print(f"{'транзакция на операцию':<24} {elapsed / total * 1e6:>9.1f} мкс/операция")
+
+        writer = DbWriter(pool).start()
+        elapsed = via_writer(writer, args.threads, args.ops)
+        print(f"{'общий писатель':<24} {elapsed / total * 1e6:>9.1f} мкс/операция")
+
+        average, worst = read_latency(pool, writer, args.reads)
+        print(f"чтение во время записи: {average * 1e6:.1f} мкс в среднем, макс {worst * 1e3:.2f} мс")
+        writer.stop()
+        print(pool.summary())
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.fake_api import generate_posts, start_server
+from common.posts_api import PostsClient
+
+# Сравнение: отдельные requests.get, последовательный пул и параллельный пул
+
+
+def bench(name, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed * 1000:>9.1f} мс  ({len(result)} ответов)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.005, help="задержка сервера, секунды")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server = start_server(generate_posts(args.posts), latency=args.latency)
+    ids = list(range(1, args.posts + 1))
+    posts_url = f"{server.url}/posts"
+
+    print(f"{args.posts} запросов /posts/{{id}}, задержка сервера {args.latency * 1000:.0f} мс")
+    bench("requests.get без сессии", lambda: [requests.get(f"{posts_url}/{i}", timeout=10).json() for i in ids])
+    with PostsClient(server.url, max_workers=args.workers) as client:
+        bench("Session, последовательно", lambda: [client.get_post(i) for i in ids])
+        bench(f"Session, {args.workers} потоков", lambda: client.get_posts_many(ids))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
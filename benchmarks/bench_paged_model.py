@@ -0,0 +1,71 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+from bench_search import synthetic_rows
+from common.db_pool import ConnectionPool
+from common.paged_model import PagedPostsModel
+from common.posts_db import bulk_insert, configure
+
+# Время до первой страницы и память: SELECT * + fetchall() (как было в Laba5)
+# против ленивой модели с постраничной подгрузкой на таблицах разного размера
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return ms, peak, result
+
+
+def fetch_all(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT * FROM posts").fetchall()
+    conn.close()
+    return len(rows)
+
+
+def first_page(path):
+    pool = ConnectionPool(path)
+    model = PagedPostsModel(pool)
+    model.refresh()
+    model.data(model.index(0, 2))
+    pool.close_all()
+    return model.rowCount()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    print(f"{'строк':>10} {'fetchall, мс':>14} {'МБ':>8} {'первая страница, мс':>21} {'МБ':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"posts_{size}.db")
+            conn = configure(sqlite3.connect(path))
+            conn.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)")
+            bulk_insert(conn, synthetic_rows(size))
+            conn.close()
+
+            all_ms, all_mb, _ = measure(lambda: fetch_all(path))
+            page_ms, page_mb, _ = measure(lambda: first_page(path))
+            print(f"{size:>10} {all_ms:>14.1f} {all_mb:>8.1f} {page_ms:>21.2f} {page_mb:>8.2f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "6лаб"))
+
+from plot_pipeline import ChartRenderer
+from stats_engine import StatsEngine
+
+# Задержка перерисовки линейного графика в зависимости от числа строк:
+# как было в Laba6 (to_datetime + ax.clear + все точки) против ChartRenderer
+# (кэш по версии данных, прореживание до ширины осей, set_data)
+
+
+def make_frame(rows, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-01", periods=rows, freq="min").astype(str),
+        "Category": pd.Categorical(rng.choice(list("ABCDE"), rows)),
+        "Value1": rng.integers(0, 500, rows).astype("int16"),
+        "Value2": rng.normal(40, 8, rows).astype("float32"),
+    })
+
+
+def new_figure():
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot(111)
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def old_redraw(figure, ax, data):
+    ax.clear()
+    data["Date"] = pd.to_datetime(data["Date"])
+    ax.plot(data["Date"], data["Value1"], label="Value1")
+    figure.canvas.draw()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'строк':>10} {'было, мс':>10} {'первый кадр, мс':>16} {'повтор, мс':>11} {'после append, мс':>17}")
+    for rows in args.sizes:
+        data = make_frame(rows)
+        figure, ax = new_figure()
+        old_ms = timed(lambda: old_redraw(figure, ax, data), args.repeat)
+
+        data["Date"] = pd.to_datetime(data["Date"])
+        engine = StatsEngine(data)
+        figure, ax = new_figure()
+        renderer = ChartRenderer(figure, ax)
+
+        def redraw():
+            # На Agg draw_idle рисует сразу, отдельный draw() не нужен
+            renderer.render(engine, "Line Chart")
+
+        first_ms = timed(redraw, 1)
+        again_ms = timed(redraw, args.repeat)
+
+        def append_and_redraw():
+            engine.append({"Date": "2030-01-01", "Value1": 1.0, "Value2": 1.0, "Category": "A"})
+            redraw()
+
+        append_ms = timed(append_and_redraw, args.repeat)
+        print(f"{rows:>10} {old_ms:>10.1f} {first_ms:>16.1f} {again_ms:>11.1f} {append_ms:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
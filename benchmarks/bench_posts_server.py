@@ -0,0 +1,120 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "2лаб"))
+
+from common.histogram import LatencyHistogram
+from common.posts_db import LABA3_COLUMNS, bulk_insert, configure
+from common.posts_search import ensure_search, posts_by_user
+from datagen import post_rows
+from posts_client import PostsQueryClient
+from posts_server import start_server
+
+# Выборка постов автора: каждый читатель открывает файл базы сам (connect +
+# запрос + close) против запроса к серверу постов - с промахом кэша (первый
+# запрос по автору), с попаданием и сразу после записи в базу другим процессом
+
+TABLE = "CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)"
+
+
+def measure(func, keys):
+    histogram = LatencyHistogram()
+    for key in keys:
+        started = time.perf_counter()
+        func(key)
+        histogram.record(time.perf_counter() - started)
+    return histogram
+
+
+def show(name, histogram):
+    print(f"{name:<34} {histogram.percentile(50) / 1000:>9.3f} {histogram.percentile(99) / 1000:>9.3f}")
+
+
+def direct_lookup(path, user_id):
+    conn = sqlite3.connect(path)
+    try:
+        return posts_by_user(conn, user_id)
+    finally:
+        conn.close()
+
+
+def concurrent_throughput(port, readers, duration, users):
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def read(slot):
+        rng = random.Random(slot)
+        with PostsQueryClient(port=port) as client:
+            while not stop.is_set():
+                client.by_user(rng.choice(users))
+                counts[slot] += 1
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=65433)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "posts.db")
+        conn = configure(sqlite3.connect(path))
+        conn.execute(TABLE)
+        bulk_insert(conn, post_rows(args.posts, users=args.users), LABA3_COLUMNS)
+        ensure_search(conn)
+
+        rng = random.Random(1)
+        hot = list(range(1, 51))  # горячие авторы, которых спрашивают чаще всего
+        keys = [rng.choice(hot) for _ in range(args.lookups)]
+        print(f"{args.posts} постов, {args.lookups} выборок по автору")
+        print(f"{'':<34} {'p50, мс':>9} {'p99, мс':>9}")
+        show("connect + запрос + close", measure(lambda user: direct_lookup(path, user), keys))
+
+        server, stop = start_server(path, port=args.port)
+        with PostsQueryClient(port=args.port) as client:
+            show("сервер, промах кэша", measure(client.by_user, range(1, args.users + 1)))
+            show("сервер, попадание", measure(client.by_user, keys))
+
+            def after_write(user):
+                with conn:
+                    conn.execute("UPDATE posts SET title = title WHERE id = ?", (user,))
+                started = time.perf_counter()
+                client.by_user(user)
+                return time.perf_counter() - started
+
+            histogram = LatencyHistogram()
+            for user in hot[:20]:
+                histogram.record(after_write(user))
+            show("сервер, сразу после записи", histogram)
+
+        rate = concurrent_throughput(args.port, args.readers, args.duration, hot)
+        print(f"{args.readers} читателей одновременно: {rate:.0f} запросов/с")
+        print(server.cache.summary())
+        stop.set()
+        server.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.posts_store import Post, PostsStore
+
+# Память и скорость фильтров на большом числе постов: список JSON-словарей
+# (как в Laba1) против списка Post со __slots__ и колоночного PostsStore
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+         "labore dolore magna aliqua enim minim veniam quis nostrud exercitation").split()
+
+
+def synthetic_rows(count, users=10_000, seed=1):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        yield (i, rng.randint(1, users), " ".join(rng.choices(WORDS, k=5)),
+               " ".join(rng.choices(WORDS, k=30)))
+
+
+def synthetic_posts(count, users=10_000, seed=1):
+    return [{"userId": user_id, "id": post_id, "title": title, "body": body}
+            for post_id, user_id, title, body in synthetic_rows(count, users, seed)]
+
+
+def measured(build):
+    # Пиковая и итоговая память на построение (tracemalloc видит и буферы NumPy)
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current / 2 ** 20, elapsed
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Каждое представление строится с нуля, чтобы строки не были общими
+    dicts, dicts_mb, dicts_s = measured(lambda: synthetic_posts(args.posts))
+    records, records_mb, records_s = measured(lambda: [Post(*row) for row in synthetic_rows(args.posts)])
+    store, store_mb, store_s = measured(lambda: PostsStore.from_rows(synthetic_rows(args.posts)))
+    print(f"{'представление':<22} {'МБ':>9} {'построение, с':>14}")
+    print(f"{'список словарей':<22} {dicts_mb:>9.1f} {dicts_s:>14.2f}")
+    print(f"{'список Post':<22} {records_mb:>9.1f} {records_s:>14.2f}")
+    print(f"{'PostsStore':<22} {store_mb:>9.1f} {store_s:>14.2f}")
+
+    users = list(range(1, 101))
+    user_set = set(users)
+    cases = (
+        ("чётный userId",
+         lambda: [p for p in dicts if p["userId"] % 2 == 0],
+         lambda: [p for p in records if p.user_id % 2 == 0],
+         lambda: store.select(store.user_parity(even=True))),
+        ("100 пользователей",
+         lambda: [p for p in dicts if p["userId"] in user_set],
+         lambda: [p for p in records if p.user_id in user_set],
+         lambda: store.select(store.by_user(*users))),
+        ("id в диапазоне",
+         lambda: [p for p in dicts if 1000 <= p["id"] < 200_000],
+         lambda: [p for p in records if 1000 <= p.id < 200_000],
+         lambda: store.select(store.id_range(1000, 200_000))),
+    )
+    print(f"\n{'фильтр, мс':<22} {'словари':>9} {'Post':>9} {'колонки':>9}")
+    for name, by_dict, by_record, by_store in cases:
+        dict_ms, expected = timed(by_dict, args.repeat)
+        record_ms, _ = timed(by_record, args.repeat)
+        store_ms, selected = timed(by_store, args.repeat)
+        assert len(selected) == len(expected)
+        print(f"{name:<22} {dict_ms:>9.1f} {record_ms:>9.1f} {store_ms:>9.1f}")
+
+    def group_dicts():
+        groups = {}
+        for post in dicts:
+            groups.setdefault(post["userId"], []).append(post)
+        return groups
+
+    dict_ms, groups = timed(group_dicts, args.repeat)
+    store_ms, grouped = timed(store.group_by_user, args.repeat)
+    assert len(groups) == len(grouped)
+    print(f"{'группировка по userId':<22} {dict_ms:>9.1f} {'-':>9} {store_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
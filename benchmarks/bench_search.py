@@ -0,0 +1,71 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.posts_db import bulk_insert, configure
+from common.posts_search import ensure_search, posts_by_user, search_ids
+
+# Поиск на большой таблице: LIKE '%...%' и выборка по user_id без индекса
+# против FTS5 и B-tree индекса
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+         "labore dolore magna aliqua enim minim veniam quis nostrud exercitation ullamco laboris "
+         "nisi aliquip commodo consequat duis aute irure reprehenderit voluptate velit esse cillum").split()
+RARE_WORD = "zephyr"  # встречается примерно в одном посте из 5000
+
+
+def synthetic_rows(count, users=10_000, seed=1):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        title = rng.choices(WORDS, k=5)
+        if rng.random() < 1 / 5000:
+            title[rng.randrange(5)] = RARE_WORD
+        yield i, rng.randint(1, users), " ".join(title), " ".join(rng.choices(WORDS, k=30))
+
+
+def timed(func, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--term", default=RARE_WORD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = configure(sqlite3.connect(os.path.join(directory, "search.db")))
+        conn.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)")
+        started = time.perf_counter()
+        bulk_insert(conn, synthetic_rows(args.rows))
+        print(f"{args.rows} строк вставлено за {time.perf_counter() - started:.1f} с")
+
+        like = lambda: conn.execute("SELECT id FROM posts WHERE title LIKE ?", (f"%{args.term}%",)).fetchall()
+        scan_user = lambda: conn.execute("SELECT * FROM posts NOT INDEXED WHERE user_id = ?", (77,)).fetchall()
+        ms, ids = timed(like)
+        print(f"{'LIKE по заголовку':<32} {ms:>9.2f} мс ({len(ids)} результатов)")
+        ms, rows = timed(scan_user)
+        print(f"{'user_id без индекса':<32} {ms:>9.2f} мс ({len(rows)} строк)")
+
+        started = time.perf_counter()
+        ensure_search(conn)
+        print(f"Индексы построены за {time.perf_counter() - started:.1f} с")
+
+        ms, ids = timed(lambda: search_ids(conn, args.term))
+        print(f"{'FTS5 MATCH + bm25':<32} {ms:>9.2f} мс ({len(ids)} результатов)")
+        ms, rows = timed(lambda: posts_by_user(conn, 77))
+        print(f"{'user_id по индексу':<32} {ms:>9.2f} мс ({len(rows)} строк)")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
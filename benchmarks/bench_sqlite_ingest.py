@@ -0,0 +1,64 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.posts_db import bulk_insert, configure
+
+# Строк в секунду: построчный commit (как в DataSaverThread) против пакетной вставки
+
+CREATE = "CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)"
+
+
+def synthetic_rows(count, users=1000):
+    for i in range(1, count + 1):
+        yield i, i % users + 1, f"title {i}", f"body of synthetic post number {i}"
+
+
+def fresh_db(directory, name):
+    path = os.path.join(directory, name)
+    conn = sqlite3.connect(path)
+    conn.execute(CREATE)
+    conn.commit()
+    return conn
+
+
+def per_row(conn, count):
+    for row in synthetic_rows(count):
+        conn.execute("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?)", row)
+        conn.commit()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--per-row-limit", type=int, default=5_000,
+                        help="сколько строк вставлять построчно (это медленно)")
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        n = args.per_row_limit
+        conn = fresh_db(directory, "per_row.db")
+        started = time.perf_counter()
+        per_row(conn, n)
+        elapsed = time.perf_counter() - started
+        conn.close()
+        print(f"{'построчный commit':<24} {n:>10} строк {n / elapsed:>12.0f} строк/с")
+
+        for size in args.sizes:
+            conn = configure(fresh_db(directory, f"bulk_{size}.db"))
+            started = time.perf_counter()
+            bulk_insert(conn, synthetic_rows(size), batch_size=args.batch)
+            elapsed = time.perf_counter() - started
+            conn.close()
+            print(f"{'executemany + WAL':<24} {size:>10} строк {size / elapsed:>12.0f} строк/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+# Синтетические данные для бенчмарков: одинаковое зерно - одинаковые данные,
+# поэтому прогоны можно сравнивать между собой и с базовой линией
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+         "labore dolore magna aliqua enim minim veniam quis nostrud exercitation ullamco laboris "
+         "nisi aliquip commodo consequat duis aute irure reprehenderit voluptate velit esse cillum").split()
+
+
+def post_rows(count, users=1000, seed=1, start=1):
+    # Кортежи (id, user_id, title, body) в порядке колонок таблицы posts
+    rng = random.Random(seed)
+    for i in range(start, start + count):
+        yield i, rng.randint(1, users), " ".join(rng.choices(WORDS, k=5)), " ".join(rng.choices(WORDS, k=30))
+
+
+def posts(count, users=1000, seed=1):
+    # Словари в форме ответа jsonplaceholder
+    return [{"userId": user_id, "id": post_id, "title": title, "body": body}
+            for post_id, user_id, title, body in post_rows(count, users, seed)]
+
+
+def csv_frame(rows, seed=1, start=0):
+    # Таблица в формате 6лаб/sample_data.csv, по минуте на строку
+    rng = np.random.default_rng(seed + start)
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-01", periods=rows, freq="min") + pd.Timedelta(minutes=start),
+        "Category": rng.choice(list("ABCDE"), rows),
+        "Value1": rng.integers(0, 500, rows),
+        "Value2": rng.normal(40, 8, rows).round(2),
+        "BooleanFlag": rng.random(rows) < 0.5,
+    })
+
+
+def write_csv(path, rows, seed=1, chunk=1_000_000):
+    for start in range(0, rows, chunk):
+        frame = csv_frame(min(chunk, rows - start), seed, start)
+        frame.to_csv(path, mode="a", header=start == 0, index=False)
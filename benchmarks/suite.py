@@ -0,0 +1,254 @@
+import argparse
+import csv
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "2лаб"))
+sys.path.append(os.path.join(ROOT, "6лаб"))
+
+from common import metrics
+from common.fake_api import start_server
+from common.posts_api import PostsClient
+from common.posts_db import BATCH_SIZE, LABA3_COLUMNS, bulk_insert, configure
+from common.posts_search import ensure_search, posts_by_user, search_ids
+from common.posts_stream import ingest_from_http
+from common.posts_sync import sync_posts
+from csv_loader import load_csv
+from datagen import post_rows, posts, write_csv
+from loadgen import run_tcp
+from plot_pipeline import ChartRenderer
+from stats_engine import StatsEngine, aggregate
+from tcp_echo_server import EchoStats, serve_selectors
+
+# Сквозной набор бенчмарков по всем лабораторным: сетевое эхо (2лаб), загрузка
+# постов по HTTP с локального сервера, запись и выборки SQLite, разбор CSV и
+# графики (6лаб). Данные синтетические и с фиксированным зерном; каждая
+# метрика - медиана нескольких повторов. Результат сравнивается с сохранённой
+# базовой линией, ухудшение больше допуска считается регрессией (код выхода 1).
+# Метрики *_per_s - чем больше, тем лучше, остальные (время) - чем меньше.
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 0.2
+TABLE = "CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)"
+
+
+def elapsed_ms(func):
+    started = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def fresh_db(directory, name):
+    # Каждый повтор - на новой базе: иначе первый прогон пишет всё, а следующие
+    # синхронизируют уже записанное, и медиана смешивает разную работу
+    path = os.path.join(directory, name)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = configure(sqlite3.connect(path))
+    conn.execute(TABLE)
+    return conn
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            socket.create_connection(("localhost", port), timeout=0.2).close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.02)
+
+
+# --- случаи ---
+
+def case_echo(scale):
+    port = free_port()
+    stop = threading.Event()
+    server = threading.Thread(target=serve_selectors, args=("localhost", port, EchoStats(), stop), daemon=True)
+    server.start()
+    try:
+        wait_for_port(port)
+        duration = max(0.5, 1.0 * scale)
+        stats = run_tcp("localhost", port, connections=4, rate=0, duration=duration, size=64, max_in_flight=16)
+    finally:
+        stop.set()
+        server.join()
+    return {
+        "messages_per_s": stats.received / duration,
+        "p50_ms": stats.histogram.percentile(50) / 1000,
+        "p99_ms": stats.histogram.percentile(99) / 1000,
+    }
+
+
+def case_http(scale, directory):
+    count = max(100, int(5000 * scale))
+    server = start_server(posts(count))
+    try:
+        with PostsClient(server.url) as client:
+            fetch_ms, fetched = elapsed_ms(client.get_posts)
+            assert len(fetched) == count
+            ids = list(range(1, min(count, 200) + 1))
+            single_ms, _ = elapsed_ms(lambda: client.get_posts_many(ids))
+            conn = fresh_db(directory, "http.db")
+            ingest_ms, _ = elapsed_ms(lambda: ingest_from_http(client.session, client.posts_url, conn,
+                                                               LABA3_COLUMNS, sync=True))
+            conn.close()
+    finally:
+        server.shutdown()
+    return {"fetch_all_ms": fetch_ms, "fetch_200_by_id_ms": single_ms, "stream_ingest_ms": ingest_ms}
+
+
+def case_sqlite(scale, directory):
+    count = max(1000, int(200_000 * scale))
+    conn = fresh_db(directory, "sqlite.db")
+    rows = list(post_rows(count))
+    insert_ms, _ = elapsed_ms(lambda: bulk_insert(conn, rows, LABA3_COLUMNS, batch_size=BATCH_SIZE))
+    # Повторная синхронизация: 1% строк изменён
+    changed = [(i, user, title + " upd", body) if i % 100 == 0 else (i, user, title, body)
+               for i, user, title, body in rows]
+    sync_ms, _ = elapsed_ms(lambda: sync_posts(conn, changed, LABA3_COLUMNS))
+    ensure_search(conn)
+    by_user_ms, _ = elapsed_ms(lambda: [posts_by_user(conn, user) for user in range(1, 201)])
+    search_ms, _ = elapsed_ms(lambda: [search_ids(conn, word) for word in ("lorem", "velit esse", "quis")])
+    conn.close()
+    return {"bulk_insert_ms": insert_ms, "sync_1pct_ms": sync_ms, "by_user_200_ms": by_user_ms,
+            "search_3_ms": search_ms}
+
+
+def case_csv(scale, directory):
+    path = os.path.join(directory, "data.csv")
+    if not os.path.exists(path):
+        write_csv(path, max(10_000, int(500_000 * scale)))
+    load_ms, (data, _) = elapsed_ms(lambda: load_csv(path, cache=None))
+    aggregate_ms, aggregates = elapsed_ms(lambda: aggregate(data))
+    engine = StatsEngine(data, aggregates=aggregates)
+    describe_ms, _ = elapsed_ms(engine.report)
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    renderer = ChartRenderer(figure, figure.add_subplot(111))
+    result = {"load_ms": load_ms, "aggregate_ms": aggregate_ms, "report_ms": describe_ms}
+    for kind in ("Line Chart", "Histogram", "Pie Chart"):
+        name = kind.split()[0].lower()
+        result[f"plot_{name}_ms"], _ = elapsed_ms(lambda: renderer.render(engine, kind))
+    return result
+
+
+CASES = {
+    "echo": lambda scale, directory: case_echo(scale),
+    "http": case_http,
+    "sqlite": case_sqlite,
+    "csv": case_csv,
+}
+
+
+# --- прогон и сравнение ---
+
+def run_case(name, scale, repeat, directory):
+    runs = []
+    for _ in range(repeat):
+        with metrics.span(f"suite.{name}"):
+            runs.append(CASES[name](scale, directory))
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+
+def compare(results, baseline, tolerance):
+    # Строки (случай, метрика, значение, база, изменение в долях, регрессия ли)
+    for case, values in results.items():
+        for metric, value in values.items():
+            base = baseline.get(case, {}).get(metric)
+            if not base:
+                yield case, metric, value, None, None, False
+                continue
+            change = (value - base) / base
+            worse = -change if higher_is_better(metric) else change
+            yield case, metric, value, base, change, worse > tolerance
+
+
+def write_results(path, results, rows):
+    if path.endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("case", "metric", "value", "baseline", "change", "regression"))
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "metrics": metrics.METRICS.snapshot()}, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Набор бенчмарков с базовой линией")
+    parser.add_argument("cases", nargs="*", help=f"из {', '.join(CASES)}; по умолчанию - все")
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель размеров данных")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="записать этот прогон как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="допустимое ухудшение, доля")
+    parser.add_argument("--out", help="куда записать результаты и метрики (.json или .csv)")
+    args = parser.parse_args()
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"неизвестные случаи: {', '.join(unknown)}")
+
+    # Заодно собираем отрезки из инструментированных модулей (http.*, ingest.*, sync.*)
+    metrics.enable()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.cases or list(CASES):
+            print(f"{name}...", flush=True)
+            results[name] = run_case(name, args.scale, args.repeat, directory)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows = list(compare(results, baseline, args.tolerance))
+
+    print(f"\n{'метрика':<28} {'значение':>12} {'база':>12} {'изменение':>10}")
+    for case, metric, value, base, change, regression in rows:
+        base_text = f"{base:>12.2f}" if base is not None else f"{'-':>12}"
+        change_text = f"{change:>+9.0%}" if change is not None else f"{'':>9}"
+        print(f"{case + '.' + metric:<28} {value:>12.2f} {base_text} {change_text}{'  РЕГРЕССИЯ' if regression else ''}")
+    print("\n" + metrics.METRICS.report())
+
+    if args.out:
+        write_results(args.out, results, rows)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nБазовая линия сохранена: {args.baseline}")
+    elif not baseline:
+        print(f"\nБазовой линии нет ({args.baseline}) - сохраните её флагом --save-baseline")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
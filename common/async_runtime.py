@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import aiohttp
+
+# Один долгоживущий цикл asyncio на отдельном потоке на всё приложение:
+# сессия aiohttp (и её пул соединений) создаётся один раз, параллельные
+# запросы ограничены семафором, а повторный запуск задачи с тем же ключом,
+# пока прежняя ещё идёт, возвращает уже работающую задачу.
+
+CONCURRENCY = 8
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+
+
+class AsyncRuntime:
+    def __init__(self, concurrency=CONCURRENCY, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.session = None
+        self.semaphore = None
+        self.inflight = {}  # ключ -> concurrent.futures.Future
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.thread is not None:
+            return self
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.open())
+            ready.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.close())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="async-runtime", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        tasks = [t for t in asyncio.all_tasks(self.loop) if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.session.close()
+
+    def submit(self, coro):
+        # Запуск корутины из любого потока; возвращает concurrent.futures.Future
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit_coalesced(self, key, factory):
+        # factory() -> корутина; вызывается, только если задача key сейчас не идёт.
+        # Возвращает (future, запущена ли новая задача)
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None and not future.done():
+                return future, False
+            future = self.submit(factory())
+            self.inflight[key] = future
+        future.add_done_callback(lambda f: self.forget(key, f))
+        return future, True
+
+    def forget(self, key, future):
+        with self.lock:
+            if self.inflight.get(key) is future:
+                del self.inflight[key]
+
+    def is_running(self, key):
+        with self.lock:
+            future = self.inflight.get(key)
+            return future is not None and not future.done()
+
+    async def limited(self, coro):
+        async with self.semaphore:
+            return await coro
+
+    async def gather_limited(self, coros):
+        # Все корутины сразу, но одновременно работают не больше concurrency
+        return await asyncio.gather(*(self.limited(coro) for coro in coros))
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.thread = None
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from common.posts_db import configure
+
+# Общий слой доступа к SQLite: у каждого потока своё долгоживущее соединение
+# (прагмы выставляются один раз при открытии), скомпилированные запросы
+# переиспользуются через кэш выражений sqlite3, чтение под WAL идёт параллельно,
+# а транзакции записи (with conn:) проходят через одну общую блокировку.
+
+STATEMENT_CACHE = 256  # сколько подготовленных выражений держит каждое соединение
+BUSY_TIMEOUT = 30.0
+MAX_IDLE = 4
+
+
+class DbStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}  # вид -> [количество, сумма, максимум] в секундах
+
+    def record(self, kind, seconds):
+        with self.lock:
+            timing = self.timings.setdefault(kind, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {kind: tuple(timing) for kind, timing in self.timings.items()}
+
+    def summary(self):
+        parts = []
+        for kind, (count, total, worst) in sorted(self.snapshot().items()):
+            parts.append(f"{kind}: {count} x {total / count * 1000:.2f} мс (макс {worst * 1000:.2f} мс)")
+        return "БД: " + (", ".join(parts) if parts else "запросов не было")
+
+
+class PooledConnection(sqlite3.Connection):
+    # Соединение пула: время execute попадает в статистику, а транзакция
+    # "with conn:" берёт общую блокировку записи, так что писатель всегда один
+    pool = None
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.pool.stats.record("query", time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.pool.stats.record("write", time.perf_counter() - started)
+
+    def __enter__(self):
+        self.pool.write_lock.acquire()
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.pool.write_lock.release()
+
+
+class ConnectionPool:
+    def __init__(self, path, pragmas=None, statement_cache=STATEMENT_CACHE, timeout=BUSY_TIMEOUT,
+                 max_idle=MAX_IDLE):
+        self.path = path
+        self.pragmas = pragmas or {}
+        self.statement_cache = statement_cache
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.local = threading.local()
+        self.write_lock = threading.RLock()
+        self.lock = threading.Lock()
+        self.idle = []
+        self.opened = []
+        self.stats = DbStats()
+
+    def open(self):
+        started = time.perf_counter()
+        # Соединение может перейти к другому потоку через список свободных,
+        # но одновременно им пользуется только один поток
+        conn = sqlite3.connect(self.path, timeout=self.timeout, factory=PooledConnection,
+                               cached_statements=self.statement_cache, check_same_thread=False)
+        conn.pool = self
+        configure(conn, **self.pragmas)
+        self.stats.record("connect", time.perf_counter() - started)
+        with self.lock:
+            self.opened.append(conn)
+        return conn
+
+    def connection(self):
+        # Соединение текущего потока; открывается при первом обращении
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            with self.lock:
+                conn = self.idle.pop() if self.idle else None
+            if conn is None:
+                conn = self.open()
+            self.local.conn = conn
+        return conn
+
+    def release(self):
+        # Вызывается в конце рабочего потока: соединение уходит в список свободных
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            return
+        self.local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+            self.opened.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def query(self, sql, parameters=()):
+        cursor = self.connection().execute(sql, parameters)
+        started = time.perf_counter()
+        rows = cursor.fetchall()
+        self.stats.record("fetch", time.perf_counter() - started)
+        return rows
+
+    def query_one(self, sql, parameters=()):
+        return self.connection().execute(sql, parameters).fetchone()
+
+    def summary(self):
+        return self.stats.summary()
+
+    def close_all(self):
+        with self.lock:
+            opened, self.opened, self.idle = self.opened, [], []
+        for conn in opened:
+            conn.close()
+        self.local = threading.local()
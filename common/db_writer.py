@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from common.metrics import count, observe
+
+# Единственный писатель в базу: все вставки, изменения и удаления (из GUI,
+# из загрузки, откуда угодно) ставятся в очередь, а поток писателя на каждом
+# такте забирает всё накопившееся и выполняет одной транзакцией. Каждая
+# операция идёт в своей точке сохранения, поэтому ошибка одной не отменяет
+# соседей; результат приходит вызывающему через Future после COMMIT.
+# Чтение писателя не ждёт: под WAL читатели видят последнюю зафиксированную версию.
+
+TICK = 0.01  # сколько ещё ждать попутных операций после первой
+MAX_BATCH = 1000  # операций в одной транзакции
+
+
+class WriteOp:
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.future = Future()
+        self.result = None
+
+
+def run_execute(conn, sql, parameters):
+    cursor = conn.execute(sql, parameters)
+    return cursor.rowcount, cursor.lastrowid
+
+
+def run_executemany(conn, sql, seq_of_parameters):
+    return conn.executemany(sql, seq_of_parameters).rowcount
+
+
+class DbWriter:
+    def __init__(self, pool, tick=TICK, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.tick = tick
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.thread = None
+        self.stopping = threading.Event()
+        # Проверка stopping и постановка в очередь - под одной блокировкой со stop(),
+        # иначе операция могла бы попасть в очередь, которую уже никто не читает
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.thread is None:
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.run, name="db-writer", daemon=True)
+            self.thread.start()
+        return self
+
+    # --- постановка в очередь (из любого потока) ---
+
+    def call(self, func, *args):
+        # func(conn, *args) выполняется в транзакции писателя; без commit и "with conn:"
+        op = WriteOp(func, args)
+        with self.lock:
+            if self.thread is None or self.stopping.is_set():
+                raise RuntimeError("писатель базы не запущен")
+            self.queue.put(op)
+        return op.future
+
+    def execute(self, sql, parameters=()):
+        # Результат - (rowcount, lastrowid)
+        return self.call(run_execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.call(run_executemany, sql, list(seq_of_parameters))
+
+    # --- поток писателя ---
+
+    def collect(self, first):
+        ops = [first]
+        deadline = time.monotonic() + self.tick
+        while len(ops) < self.max_batch:
+            try:
+                ops.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return ops
+
+    def run(self):
+        conn = self.pool.connection()
+        try:
+            while not (self.stopping.is_set() and self.queue.empty()):
+                try:
+                    first = self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                self.apply(conn, self.collect(first))
+        finally:
+            self.pool.release()
+            # Если поток завершился аварийно, ждущие результата не должны висеть вечно,
+            # а новые операции сразу получают RuntimeError
+            with self.lock:
+                self.stopping.set()
+            while True:
+                try:
+                    op = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op.future.set_running_or_notify_cancel():
+                    op.future.set_exception(RuntimeError("писатель базы остановлен"))
+
+    def apply(self, conn, ops):
+        started = time.perf_counter()
+        done = []
+        with self.pool.write_lock:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for op in ops:
+                    if not op.future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT op")
+                    try:
+                        op.result = op.func(conn, *op.args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO op")
+                        conn.execute("RELEASE op")
+                        op.future.set_exception(e)
+                    else:
+                        conn.execute("RELEASE op")
+                        done.append(op)
+                conn.commit()
+            except Exception as e:
+                # Не удалось начать или зафиксировать транзакцию - не записалось ничего
+                if conn.in_transaction:
+                    conn.rollback()
+                for op in ops:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+                return
+        elapsed = time.perf_counter() - started
+        self.pool.stats.record("tick", elapsed)
+        observe("db.writer.tick", elapsed)
+        count("db.writer.ops", len(ops))
+        for op in done:
+            op.future.set_result(op.result)
+
+    def stop(self):
+        # Дописывает то, что уже в очереди, и останавливает поток
+        with self.lock:
+            if self.thread is None:
+                return
+            self.stopping.set()
+        self.thread.join()
+        self.thread = None
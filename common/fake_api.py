@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Локальная замена jsonplaceholder: те же пути /posts, /posts/{id}, ?userId=, ?_page=&_limit=
+# и та же форма JSON. Нужна для проверок и бенчмарков без внешней сети.
+
+
+def generate_posts(count=100, users=10):
+    per_user = max(1, count // users)
+    return [
+        {
+            "userId": i // per_user + 1,
+            "id": i + 1,
+            "title": f"post title {i + 1}",
+            "body": f"body of post {i + 1}\nline two of the post body",
+        }
+        for i in range(count)
+    ]
+
+
+class PostsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, как у настоящего сервиса
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        etag = 'W/"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if status == 200 and self.command == "GET" and self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(self.server.modified_at, usegmt=True))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def route(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if not parts or parts[0] != "posts" or len(parts) > 2:
+            return None, None, url
+        post_id = int(parts[1]) if len(parts) == 2 and parts[1].isdigit() else None
+        return parts, post_id, url
+
+    def do_GET(self):
+        parts, post_id, url = self.route()
+        if parts is None:
+            return self.send_json(404, {})
+        posts = self.server.posts
+        if post_id is not None:
+            post = posts.get(post_id)
+            return self.send_json(200, post) if post else self.send_json(404, {})
+        result = list(posts.values())
+        query = parse_qs(url.query)
+        user_ids = query.get("userId")
+        if user_ids:
+            wanted = {int(u) for u in user_ids}
+            result = [p for p in result if p["userId"] in wanted]
+        headers = None
+        if "_page" in query or "_limit" in query:
+            # Как у json-server: страницы с единицы, общее число в X-Total-Count
+            limit = int(query.get("_limit", ["10"])[0])
+            page = int(query.get("_page", ["1"])[0])
+            headers = {"X-Total-Count": str(len(result))}
+            result = result[(page - 1) * limit:page * limit]
+        self.send_json(200, result, headers)
+
+    def do_POST(self):
+        parts, post_id, _ = self.route()
+        if parts is None or post_id is not None:
+            return self.send_json(404, {})
+        data = self.read_json()
+        with self.server.lock:
+            data["id"] = max(self.server.posts, default=0) + 1
+            self.server.posts[data["id"]] = data
+            self.server.modified_at = time.time()
+        self.send_json(201, data)
+
+    def do_PUT(self):
+        parts, post_id, _ = self.route()
+        if parts is None or post_id is None:
+            return self.send_json(404, {})
+        data = self.read_json()
+        data["id"] = post_id
+        with self.server.lock:
+            self.server.posts[post_id] = data
+            self.server.modified_at = time.time()
+        self.send_json(200, data)
+
+
+class FakePostsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("localhost", 0), posts=None, latency=0.0):
+        super().__init__(address, PostsHandler)
+        self.posts = {p["id"]: p for p in (posts if posts is not None else generate_posts())}
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.modified_at = time.time()
+        self.not_modified = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(posts=None, latency=0.0, port=0):
+    server = FakePostsServer(("localhost", port), posts, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный сервер API постов")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, секунды")
+    args = parser.parse_args()
+
+    server = FakePostsServer(("localhost", args.port), generate_posts(args.posts), args.latency)
+    print(f"Сервер постов: {server.url}/posts")
+    server.serve_forever()
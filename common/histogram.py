@@ -0,0 +1,74 @@
+# Гистограмма задержек в духе HDR: логарифмические корзины, внутри каждой
+# 64 линейные подкорзины, относительная ошибка не больше ~1.6%.
+# Значения хранятся в микросекундах.
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+
+def bucket_index(value):
+    shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+    return shift * SUB_BUCKET_HALF + (value >> shift)
+
+
+def bucket_bounds(index):
+    if index < 2 * SUB_BUCKET_HALF:
+        return index, index + 1
+    shift = (index - SUB_BUCKET_HALF) // SUB_BUCKET_HALF
+    sub = index - shift * SUB_BUCKET_HALF
+    return sub << shift, (sub + 1) << shift
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        # Возвращает верхнюю границу корзины в микросекундах
+        if not self.total:
+            return 0
+        target = max(1, int(round(p / 100 * self.total)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bucket_bounds(index)[1] - 1, self.max)
+        return self.max
+
+    def report(self, percentiles=(50, 75, 90, 99, 99.9, 99.99, 100), bars=12, width=40):
+        lines = [f"{'перцентиль':>12} {'задержка, мс':>14}"]
+        for p in percentiles:
+            lines.append(f"{p:>12} {self.percentile(p) / 1000:>14.3f}")
+        if self.total:
+            # Грубая текстовая гистограмма по логарифмическим диапазонам
+            bins = {}
+            for index, count in self.counts.items():
+                low = bucket_bounds(index)[0]
+                key = low.bit_length()
+                bins[key] = bins.get(key, 0) + count
+            peak = max(bins.values())
+            lines.append("")
+            for key in sorted(bins)[-bars:]:
+                low = (1 << (key - 1)) if key else 0
+                bar = "#" * max(1, int(bins[key] / peak * width))
+                lines.append(f"{'>= ' + format(low / 1000, '.3f') + ' мс':>16} {bins[key]:>9} {bar}")
+        return "\n".join(lines)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+# HTTP-кэш в памяти и на диске: свежие ответы (моложе TTL) отдаются без
+# запроса, устаревшие перепроверяются через If-None-Match/If-Modified-Since,
+# и ответ 304 считается попаданием. Объём ограничен, вытеснение по LRU.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".http_cache")
+
+
+def cache_key(url, params=None):
+    if params:
+        url = f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+    return url
+
+
+class CacheEntry:
+    def __init__(self, body, etag=None, last_modified=None, stored_at=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at or time.time()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def meta(self):
+        return {"etag": self.etag, "last_modified": self.last_modified, "stored_at": self.stored_at}
+
+
+class HttpCache:
+    def __init__(self, directory=CACHE_DIR, ttl=60.0, max_entries=256, max_bytes=64 << 20,
+                 max_disk_bytes=256 << 20):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # --- хранение ---
+
+    def _paths(self, key):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, name + ".json"), os.path.join(self.directory, name + ".body")
+
+    def _load_from_disk(self, key):
+        if not self.directory:
+            return None
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(body, meta.get("etag"), meta.get("last_modified"), meta.get("stored_at"))
+
+    def _save_to_disk(self, key, entry, body_changed=True):
+        if not self.directory:
+            return
+        meta_path, body_path = self._paths(key)
+        try:
+            if body_changed:
+                tmp = body_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(entry.body)
+                os.replace(tmp, body_path)
+            with open(meta_path, "w") as f:
+                json.dump(entry.meta(), f)
+        except OSError:
+            return
+        if body_changed:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        try:
+            files = [os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith(".body")]
+            stats = sorted(((os.stat(p).st_atime, os.path.getsize(p), p) for p in files))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.max_disk_bytes:
+                break
+            for victim in (path, path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            total -= size
+
+    def _remember(self, key, entry):
+        old = self.memory.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= len(old.body)
+        self.memory[key] = entry
+        self.memory_bytes += len(entry.body)
+        while self.memory and (len(self.memory) > self.max_entries or self.memory_bytes > self.max_bytes):
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted.body)
+            self.counters["evictions"] += 1
+
+    # --- интерфейс ---
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self.memory.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.ttl
+
+    def record_hit(self, entry):
+        with self.lock:
+            self.counters["hits"] += 1
+            self.counters["bytes_saved"] += len(entry.body)
+
+    def record_not_modified(self, key, entry):
+        with self.lock:
+            entry.stored_at = time.time()
+            self.counters["revalidated"] += 1
+            self.counters["bytes_saved"] += len(entry.body)
+            self._save_to_disk(key, entry, body_changed=False)
+
+    def store(self, key, body, headers):
+        entry = CacheEntry(body, headers.get("ETag"), headers.get("Last-Modified"))
+        with self.lock:
+            self.counters["misses"] += 1
+            self._remember(key, entry)
+            self._save_to_disk(key, entry)
+        return entry
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.memory), memory_bytes=self.memory_bytes)
+
+    def summary(self):
+        s = self.stats()
+        return (f"кэш: попаданий {s['hits']}, 304: {s['revalidated']}, промахов {s['misses']}, "
+                f"сэкономлено {s['bytes_saved'] / 1024:.1f} КБ")
+
+
+# Условный GET через requests.Session. Возвращает (тело, изменилось ли оно)
+def cached_get(cache, session, url, params=None, timeout=None):
+    key = cache_key(url, params)
+    entry = cache.lookup(key)
+    if entry is not None and cache.is_fresh(entry):
+        cache.record_hit(entry)
+        return entry.body, False
+    headers = entry.conditional_headers() if entry is not None else {}
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:
+        cache.record_not_modified(key, entry)
+        return entry.body, False
+    response.raise_for_status()
+    cache.store(key, response.content, response.headers)
+    return response.content, True
+
+
+# То же для aiohttp.ClientSession
+async def async_cached_get(cache, session, url, params=None):
+    key = cache_key(url, params)
+    entry = cache.lookup(key)
+    if entry is not None and cache.is_fresh(entry):
+        cache.record_hit(entry)
+        return entry.body, False
+    headers = entry.conditional_headers() if entry is not None else {}
+    async with session.get(url, params=params, headers=headers) as response:
+        if response.status == 304 and entry is not None:
+            cache.record_not_modified(key, entry)
+            return entry.body, False
+        response.raise_for_status()
+        body = await response.read()
+        cache.store(key, body, response.headers)
+        return body, True
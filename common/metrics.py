@@ -0,0 +1,152 @@
+import atexit
+import csv
+import functools
+import json
+import os
+import threading
+import time
+
+from common.histogram import LatencyHistogram
+
+# Лёгкая инструментация горячих путей: отрезки времени (span - контекстный
+# менеджер или декоратор), счётчики и гистограммы задержек. По умолчанию
+# выключена и стоит одну проверку флага; включается переменной окружения
+# LAB_METRICS=путь.json|путь.csv - тогда при выходе из программы всё
+# собранное пишется в этот файл.
+
+METRICS_ENV = "LAB_METRICS"
+PERCENTILES = (50, 90, 99)
+
+
+class Span:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        if exc_type is not None:
+            self.metrics.count(f"{self.name}.errors")
+        return False
+
+
+class NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NO_SPAN = NoSpan()
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # имя -> [LatencyHistogram, сумма секунд]
+
+    def span(self, name):
+        return Span(self, name) if self.enabled else NO_SPAN
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            entry = self.histograms.get(name)
+            if entry is None:
+                entry = self.histograms[name] = [LatencyHistogram(), 0.0]
+            entry[0].record(seconds)
+            entry[1] += seconds
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def snapshot(self):
+        # Времена в миллисекундах
+        with self.lock:
+            histograms = {}
+            for name, (histogram, total) in self.histograms.items():
+                summary = {"count": histogram.total, "total_ms": total * 1000,
+                           "mean_ms": total / histogram.total * 1000,
+                           "min_ms": (histogram.min or 0) / 1000, "max_ms": histogram.max / 1000}
+                for p in PERCENTILES:
+                    summary[f"p{p}_ms"] = histogram.percentile(p) / 1000
+                histograms[name] = summary
+            return {"counters": dict(self.counters), "histograms": histograms}
+
+    def rows(self):
+        # Плоский вид для CSV: (вид, имя, поле, значение)
+        snapshot = self.snapshot()
+        for name, value in sorted(snapshot["counters"].items()):
+            yield "counter", name, "value", value
+        for name, summary in sorted(snapshot["histograms"].items()):
+            for field, value in summary.items():
+                yield "histogram", name, field, round(value, 4)
+
+    def write(self, path):
+        if path.endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(("kind", "name", "field", "value"))
+                writer.writerows(self.rows())
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def report(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, summary in sorted(snapshot["histograms"].items()):
+            lines.append(f"{name:<28} {summary['count']:>8} x {summary['mean_ms']:>9.3f} мс "
+                         f"(p99 {summary['p99_ms']:.3f}, макс {summary['max_ms']:.3f})")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<28} {value:>8}")
+        return "\n".join(lines)
+
+
+METRICS = Metrics()
+span = METRICS.span
+timed = METRICS.timed
+count = METRICS.count
+observe = METRICS.observe
+
+
+def enable(path=None):
+    # path - куда записать метрики при выходе (None - только собирать)
+    METRICS.enabled = True
+    if path:
+        atexit.register(METRICS.write, path)
+
+
+if os.environ.get(METRICS_ENV):
+    enable(os.environ[METRICS_ENV])
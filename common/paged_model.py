@@ -0,0 +1,376 @@
+import sqlite3
+from collections import OrderedDict
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont
+
+from common.metrics import timed
+from common.posts_db import LABA3_COLUMNS
+
+# Ленивая модель таблицы постов для QTableView: строки читаются страницами по
+# мере прокрутки (canFetchMore/fetchMore), страницы ищутся по ключу
+# (WHERE id > последний_id), а не через OFFSET. В памяти - только границы
+# страниц и несколько последних страниц в LRU-кэше, а не вся таблица.
+#
+# В режиме ручной фиксации (manual_submit) правки, удаления и новые строки
+# копятся по id и показываются поверх страниц; submit_all() пишет их одной
+# транзакцией и обновляет только затронутые строки, без перечитывания таблицы.
+
+PAGE_SIZE = 500
+CACHE_PAGES = 20
+DELETE_BATCH = 500  # id в одном DELETE ... IN (...)
+
+EDITED_BRUSH = QBrush(QColor(255, 244, 200))
+DELETED_BRUSH = QBrush(QColor(150, 150, 150))
+
+
+class PagedPostsModel(QAbstractTableModel):
+    def __init__(self, pool, columns=LABA3_COLUMNS, headers=None, table="posts",
+                 page_size=PAGE_SIZE, cache_pages=CACHE_PAGES, editable=False, parent=None):
+        super().__init__(parent)
+        self.pool = pool  # common.db_pool.ConnectionPool; модель читает через соединение потока GUI
+        self.columns = columns
+        self.headers = headers or list(columns)
+        self.table = table
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.editable = editable
+        self.select_sql = f"SELECT {', '.join(columns)} FROM {table}"
+        self.id_col = columns[0]
+        self.ranked_ids = None
+        self.manual_submit = False
+        self.staged_edits = {}  # id -> {номер колонки: значение}
+        self.staged_deletes = set()
+        self.staged_inserts = []  # (user_id, title, body)
+        self.reset_state()
+
+    def reset_state(self):
+        self.page_starts = []  # id первой строки каждой загруженной страницы
+        self.pages = OrderedDict()
+        self.loaded_rows = 0
+        self.last_id = None
+        self.exhausted = False
+
+    # --- чтение страниц ---
+
+    @timed("model.query_page")
+    def query_page(self, start_id=None, after_id=None):
+        try:
+            if start_id is not None:
+                sql = f"{self.select_sql} WHERE {self.id_col} >= ? ORDER BY {self.id_col} LIMIT ?"
+                params = (start_id, self.page_size)
+            elif after_id is not None:
+                sql = f"{self.select_sql} WHERE {self.id_col} > ? ORDER BY {self.id_col} LIMIT ?"
+                params = (after_id, self.page_size)
+            else:
+                sql = f"{self.select_sql} ORDER BY {self.id_col} LIMIT ?"
+                params = (self.page_size,)
+            return self.pool.query(sql, params)
+        except sqlite3.OperationalError:
+            return []  # таблицы ещё нет
+
+    @timed("model.query_page")
+    def query_ranked_page(self, page):
+        ids = self.ranked_ids[page * self.page_size:(page + 1) * self.page_size]
+        if not ids:
+            return []
+        placeholders = ", ".join("?" * len(ids))
+        rows = self.pool.query(f"{self.select_sql} WHERE {self.id_col} IN ({placeholders})", ids)
+        by_id = {row[0]: row for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def remember(self, page, rows):
+        self.pages[page] = rows
+        self.pages.move_to_end(page)
+        while len(self.pages) > self.cache_pages:
+            self.pages.popitem(last=False)
+
+    def page(self, number):
+        rows = self.pages.get(number)
+        if rows is not None:
+            self.pages.move_to_end(number)
+            return rows
+        if self.ranked_ids is not None:
+            rows = self.query_ranked_page(number)
+        else:
+            rows = self.query_page(start_id=self.page_starts[number])
+        self.remember(number, rows)
+        return rows
+
+    def row(self, row):
+        rows = self.page(row // self.page_size)
+        offset = row % self.page_size
+        return rows[offset] if offset < len(rows) else None
+
+    def post_id(self, row):
+        values = self.row(row)
+        return values[0] if values else None
+
+    # --- интерфейс QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        values = self.row(index.row())
+        if values is None:
+            return None
+        edits = self.staged_edits.get(values[0])
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            value = values[index.column()]
+            if edits and index.column() in edits:
+                value = edits[index.column()]
+            return value if role == Qt.EditRole else ("" if value is None else str(value))
+        # Отложенные изменения: удаляемые строки серые и зачёркнутые, правки подсвечены
+        deleted = values[0] in self.staged_deletes
+        if role == Qt.ForegroundRole and deleted:
+            return DELETED_BRUSH
+        if role == Qt.FontRole and deleted:
+            font = QFont()
+            font.setStrikeOut(True)
+            return font
+        if role == Qt.BackgroundRole and edits and index.column() in edits:
+            return EDITED_BRUSH
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.editable and index.isValid() and index.column() > 0:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        # Правка ячейки сразу пишется в базу одним UPDATE по id,
+        # а в режиме ручной фиксации только откладывается до submit_all()
+        if role != Qt.EditRole or not self.editable or not index.isValid():
+            return False
+        values = self.row(index.row())
+        if values is None:
+            return False  # строки уже нет (обновление или удаление между показом и правкой)
+        if self.manual_submit:
+            self.staged_edits.setdefault(values[0], {})[index.column()] = value
+            self.dataChanged.emit(index, index)
+            return True
+        column = self.columns[index.column()]
+        with self.pool.transaction() as conn:
+            conn.execute(f"UPDATE {self.table} SET {column} = ? WHERE {self.id_col} = ?", (value, values[0]))
+        page = self.pages.get(index.row() // self.page_size)
+        offset = index.row() % self.page_size
+        if page is not None and offset < len(page):
+            page[offset] = tuple(value if i == index.column() else v for i, v in enumerate(page[offset]))
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        page = len(self.page_starts)
+        if self.ranked_ids is not None:
+            rows = self.query_ranked_page(page)
+        else:
+            rows = self.query_page(after_id=self.last_id)
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + len(rows) - 1)
+        self.page_starts.append(rows[0][0])
+        self.remember(page, rows)
+        self.loaded_rows += len(rows)
+        self.last_id = rows[-1][0]
+        self.endInsertRows()
+
+    # --- управление ---
+
+    def refresh(self):
+        # Сбрасывает кэш и снова читает только первую страницу
+        self.beginResetModel()
+        self.reset_state()
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_ranked_ids(self, ids):
+        # Показывать только эти id в заданном порядке (None - вся таблица)
+        self.ranked_ids = list(ids) if ids is not None else None
+        self.refresh()
+
+    # --- пакетная правка ---
+
+    def set_manual_submit(self, manual):
+        # Выключать режим нужно после submit_all() или revert_all()
+        self.manual_submit = manual
+
+    def pending_counts(self):
+        # (правок строк, удалений, новых строк)
+        return len(self.staged_edits), len(self.staged_deletes), len(self.staged_inserts)
+
+    def has_pending(self):
+        return any(self.pending_counts())
+
+    def stage_delete(self, rows):
+        ids = [self.post_id(row) for row in rows]
+        self.staged_deletes.update(i for i in ids if i is not None)
+        for row in rows:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def stage_insert(self, rows):
+        self.staged_inserts.extend(rows)
+
+    def revert_all(self):
+        ids = set(self.staged_edits) | self.staged_deletes
+        self.staged_edits = {}
+        self.staged_deletes = set()
+        self.staged_inserts = []
+        self.emit_changed(self.loaded_positions(ids))
+
+    def submit_all(self):
+        # Всё отложенное - одной транзакцией; при ошибке ничего не записано и
+        # отложенные изменения остаются, чтобы их можно было поправить
+        edits = {i: values for i, values in self.staged_edits.items() if i not in self.staged_deletes}
+        self.apply(edits, self.staged_deletes, self.staged_inserts)
+        self.staged_edits = {}
+        self.staged_deletes = set()
+        self.staged_inserts = []
+
+    def delete_rows(self, rows):
+        ids = {self.post_id(row) for row in rows}
+        ids.discard(None)
+        self.apply({}, ids, [])
+
+    def insert_rows(self, rows):
+        self.apply({}, set(), rows)
+
+    def apply(self, edits, deletes, inserts):
+        # Позиции удаляемых строк нужны до записи: после неё их уже не найти
+        positions = self.loaded_positions(deletes)
+        user_col, title_col, body_col = self.columns[1:4]
+        with self.pool.transaction() as conn:
+            by_column = {}
+            for post_id, values in edits.items():
+                for column, value in values.items():
+                    by_column.setdefault(column, []).append((value, post_id))
+            for column, params in by_column.items():
+                conn.executemany(f"UPDATE {self.table} SET {self.columns[column]} = ? WHERE {self.id_col} = ?",
+                                 params)
+            ids = sorted(deletes)
+            for start in range(0, len(ids), DELETE_BATCH):
+                batch = ids[start:start + DELETE_BATCH]
+                conn.execute(f"DELETE FROM {self.table} WHERE {self.id_col} IN ({', '.join('?' * len(batch))})",
+                             batch)
+            if inserts:
+                conn.executemany(f"INSERT INTO {self.table} ({user_col}, {title_col}, {body_col}) VALUES (?, ?, ?)",
+                                 inserts)
+        self.patch_pages(edits)
+        if deletes:
+            self.remove_positions(positions, deletes)
+        if inserts and self.ranked_ids is None and self.exhausted:
+            self.extend_tail()  # новые id больше всех прежних - они в хвосте таблицы
+
+    # --- частичное обновление ---
+
+    def loaded_positions(self, ids):
+        # Номера уже загруженных строк с этими id, по возрастанию
+        if not ids:
+            return []
+        if self.ranked_ids is not None:
+            positions = [row for row, post_id in enumerate(self.ranked_ids) if post_id in ids]
+        else:
+            # Вся таблица идёт по возрастанию id: номер строки - число id перед ней.
+            # Нужны только загруженные строки, дальше них не читаем
+            rows = self.pool.query(f"SELECT {self.id_col} FROM {self.table} WHERE {self.id_col} <= ? "
+                                   f"ORDER BY {self.id_col} LIMIT ?", (max(ids), self.loaded_rows))
+            positions = [row for row, (post_id,) in enumerate(rows) if post_id in ids]
+        return [row for row in positions if row < self.loaded_rows]
+
+    def emit_changed(self, positions):
+        last = len(self.columns) - 1
+        for row in positions:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last))
+
+    def patch_pages(self, edits):
+        # Изменённые значения подставляются в кэшированные страницы без запроса к базе
+        if not edits:
+            return
+        positions = []
+        for number, rows in self.pages.items():
+            for offset, values in enumerate(rows):
+                changed = edits.get(values[0])
+                if changed:
+                    rows[offset] = tuple(changed.get(i, v) for i, v in enumerate(values))
+                    positions.append(number * self.page_size + offset)
+        self.emit_changed(sorted(positions))
+
+    def remove_positions(self, positions, deletes):
+        if self.ranked_ids is not None:
+            self.ranked_ids = [i for i in self.ranked_ids if i not in deletes]
+        if not positions:
+            return  # удалённые строки ещё не загружались
+        first_page = positions[0] // self.page_size
+        # Идём с конца, группами подряд идущих строк, чтобы номера впереди не сдвигались
+        groups = []
+        for row in positions:
+            if groups and groups[-1][1] == row - 1:
+                groups[-1][1] = row
+            else:
+                groups.append([row, row])
+        for start, end in reversed(groups):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            self.loaded_rows -= end - start + 1
+            self.endRemoveRows()
+        # Границы страниц после первой затронутой пересчитываются одним запросом по id
+        remaining = self.loaded_rows - first_page * self.page_size
+        if self.ranked_ids is not None:
+            ids = self.ranked_ids[first_page * self.page_size:self.loaded_rows]
+        else:
+            ids = [row[0] for row in self.pool.query(
+                f"SELECT {self.id_col} FROM {self.table} WHERE {self.id_col} >= ? ORDER BY {self.id_col} LIMIT ?",
+                (self.page_starts[first_page], remaining))]
+        self.page_starts = self.page_starts[:first_page] + ids[::self.page_size]
+        # Страницы с первой затронутой сдвинулись - их перечитают при показе
+        for number in [n for n in self.pages if n >= first_page]:
+            del self.pages[number]
+        if self.ranked_ids is None:
+            self.last_id = ids[-1] if ids else (self.post_id(self.loaded_rows - 1) if self.loaded_rows else None)
+        if self.loaded_rows % self.page_size or not self.loaded_rows:
+            self.extend_tail()  # последняя страница стала неполной - добираем её
+        if first_page * self.page_size < self.loaded_rows:
+            self.dataChanged.emit(self.index(first_page * self.page_size, 0),
+                                  self.index(self.loaded_rows - 1, len(self.columns) - 1))
+
+    def extend_tail(self):
+        # Перечитывает только последнюю страницу и добавляет строки, которых в ней не хватало
+        if not self.page_starts:
+            self.exhausted = False
+            self.fetchMore()
+            return
+        number = len(self.page_starts) - 1
+        if self.ranked_ids is not None:
+            rows = self.query_ranked_page(number)
+        else:
+            rows = self.query_page(start_id=self.page_starts[number])
+        self.remember(number, rows)
+        self.exhausted = len(rows) < self.page_size
+        loaded = number * self.page_size + len(rows)
+        if loaded > self.loaded_rows:
+            self.beginInsertRows(QModelIndex(), self.loaded_rows, loaded - 1)
+            self.loaded_rows = loaded
+            self.endInsertRows()
+        if rows:
+            self.last_id = rows[-1][0]
@@ -0,0 +1,96 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.http_cache import cached_get
+from common.metrics import count, span
+
+# Общий HTTP-клиент для API постов: один requests.Session с пулом
+# keep-alive соединений, повторами с экспоненциальной задержкой и таймаутами.
+
+BASE_URL = "https://jsonplaceholder.typicode.com"
+TIMEOUT = (3.05, 10)  # (подключение, чтение), секунды
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def make_session(pool_size=16, retries=3, backoff=0.3):
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PostsClient:
+    def __init__(self, base_url=BASE_URL, max_workers=8, timeout=TIMEOUT, session=None, cache=None):
+        self.base_url = base_url.rstrip("/")
+        self.posts_url = f"{self.base_url}/posts"
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = session or make_session(pool_size=max_workers)
+        self.cache = cache
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with span(f"http.{method.lower()}"):
+            response = self.session.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    # GET с учётом кэша: возвращает (данные, изменились ли они с прошлого раза)
+    def get_json(self, url, params=None):
+        if self.cache is None:
+            return self.request("GET", url, params=params).json(), True
+        with span("http.get"):
+            body, changed = cached_get(self.cache, self.session, url, params, self.timeout)
+        if not changed:
+            count("http.not_modified")
+        return json.loads(body), changed
+
+    def get_posts_if_changed(self, **params):
+        return self.get_json(self.posts_url, params or None)
+
+    def get_posts(self, **params):
+        return self.get_json(self.posts_url, params or None)[0]
+
+    def get_post(self, post_id):
+        return self.get_json(f"{self.posts_url}/{post_id}")[0]
+
+    def get_posts_by_user(self, user_id):
+        return self.get_posts(userId=user_id)
+
+    def create_post(self, data):
+        return self.request("POST", self.posts_url, json=data).json()
+
+    def update_post(self, post_id, data):
+        return self.request("PUT", f"{self.posts_url}/{post_id}", json=data).json()
+
+    # Параллельная загрузка с ограничением числа одновременных запросов
+    def map_concurrent(self, func, items):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(func, items))
+
+    def get_posts_many(self, post_ids):
+        return self.map_concurrent(self.get_post, post_ids)
+
+    def get_posts_for_users(self, user_ids):
+        return dict(zip(user_ids, self.map_concurrent(self.get_posts_by_user, user_ids)))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
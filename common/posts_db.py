@@ -0,0 +1,55 @@
+import itertools
+
+# Пакетная запись постов в SQLite: executemany внутри одной транзакции на
+# пачку, WAL и настроенные synchronous/cache_size вместо fsync на каждую строку.
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # в КиБ, т.е. ~64 МБ
+    "temp_store": "MEMORY",
+    # INSERT OR REPLACE удаляет старую строку без триггеров DELETE, если они
+    # не рекурсивные, - и в индексе поиска (common.posts_search) остался бы старый текст
+    "recursive_triggers": "ON",
+}
+BATCH_SIZE = 5000
+
+# Колонки таблицы posts в разных лабораторных: Laba3 - user_id, Laba5 - userId
+LABA3_COLUMNS = ("id", "user_id", "title", "body")
+LABA5_COLUMNS = ("id", "userId", "title", "body")
+
+
+def configure(conn, **overrides):
+    for name, value in dict(PRAGMAS, **overrides).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def post_rows(posts):
+    # Словари из API -> кортежи в порядке колонок
+    for post in posts:
+        yield post["id"], post["userId"], post["title"], post["body"]
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(conn, rows, columns=LABA3_COLUMNS, table="posts", conflict="OR REPLACE",
+                batch_size=BATCH_SIZE, progress=None):
+    # rows - любой итерируемый поток кортежей; progress(вставлено) вызывается после каждой пачки
+    placeholders = ", ".join("?" * len(columns))
+    query = f"INSERT {conflict} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    inserted = 0
+    for batch in batched(rows, batch_size):
+        with conn:
+            conn.executemany(query, batch)
+        inserted += len(batch)
+        if progress is not None:
+            progress(inserted)
+    return inserted
@@ -0,0 +1,101 @@
+import re
+import sqlite3
+
+from common.posts_db import LABA3_COLUMNS
+
+# Поиск по постам: полнотекстовый индекс FTS5 над title/body, который
+# поддерживается триггерами, и обычный B-tree индекс по автору. Текст
+# пользователя всегда передаётся связанным параметром, а не подставляется в SQL.
+
+SEARCH_LIMIT = 200
+FTS_TABLE = "posts_fts"
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def has_fts5(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def ensure_search(conn, columns=LABA3_COLUMNS, table="posts"):
+    # Создаёт индексы один раз; возвращает True, если доступен FTS5
+    id_col, user_col, title_col, body_col = columns
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{user_col} ON {table} ({user_col})")
+    if not has_fts5(conn):
+        conn.commit()
+        return False
+
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+    if not exists:
+        conn.executescript(f"""
+            CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                {title_col}, {body_col}, content='{table}', content_rowid='{id_col}'
+            );
+            CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, {title_col}, {body_col})
+                VALUES (new.{id_col}, new.{title_col}, new.{body_col});
+            END;
+            CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {title_col}, {body_col})
+                VALUES ('delete', old.{id_col}, old.{title_col}, old.{body_col});
+            END;
+            CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {title_col}, {body_col} ON {table} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {title_col}, {body_col})
+                VALUES ('delete', old.{id_col}, old.{title_col}, old.{body_col});
+                INSERT INTO {FTS_TABLE}(rowid, {title_col}, {body_col})
+                VALUES (new.{id_col}, new.{title_col}, new.{body_col});
+            END;
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild');
+        """)
+    conn.commit()
+    return True
+
+
+def fts_query(text):
+    # Каждое слово - префиксный термин в кавычках, все термины обязательны
+    terms = TOKEN.findall(text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_ids(conn, text, limit=SEARCH_LIMIT, columns=LABA3_COLUMNS, table="posts", fts=True, title_only=False):
+    # id постов в порядке релевантности (bm25), при отсутствии FTS5 - по LIKE (только title)
+    if fts:
+        query = fts_query(text)
+        if not query:
+            return []
+        if title_only:
+            query = f"{columns[2]} : ({query})"
+        rows = conn.execute(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? ORDER BY rank LIMIT ?",
+                            (query, limit))
+    else:
+        id_col, _, title_col, _ = columns
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = conn.execute(f"SELECT {id_col} FROM {table} WHERE {title_col} LIKE ? ESCAPE '\\' LIMIT ?",
+                            (pattern, limit))
+    return [row[0] for row in rows]
+
+
+def search_posts(conn, text, limit=SEARCH_LIMIT, columns=LABA3_COLUMNS, table="posts"):
+    id_col, user_col, title_col, body_col = columns
+    query = fts_query(text)
+    if not query:
+        return []
+    return conn.execute(
+        f"SELECT p.{id_col}, p.{user_col}, p.{title_col}, p.{body_col} "
+        f"FROM {FTS_TABLE} f JOIN {table} p ON p.{id_col} = f.rowid "
+        f"WHERE {FTS_TABLE} MATCH ? ORDER BY f.rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
+
+
+def posts_by_user(conn, user_id, columns=LABA3_COLUMNS, table="posts"):
+    # Использует индекс idx_posts_<user_col>, созданный ensure_search
+    id_col, user_col, title_col, body_col = columns
+    return conn.execute(
+        f"SELECT {id_col}, {user_col}, {title_col}, {body_col} FROM {table} WHERE {user_col} = ?",
+        (user_id,),
+    ).fetchall()
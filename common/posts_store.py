@@ -0,0 +1,155 @@
+import numpy as np
+
+# Компактное представление постов в памяти вместо списка JSON-словарей:
+# Post - запись со __slots__ (без __dict__ на каждый объект), PostsStore -
+# колоночное хранилище: id и userId в массивах NumPy, заголовки и тексты -
+# один буфер UTF-8 со смещениями на колонку. Фильтры (по пользователю,
+# чётность, диапазоны) считаются векторно и возвращают булевы маски,
+# select() собирает по маске новое хранилище, не копируя сам текст.
+
+
+class Post:
+    __slots__ = ("id", "user_id", "title", "body")
+
+    def __init__(self, id, user_id, title, body):
+        self.id = id
+        self.user_id = user_id
+        self.title = title
+        self.body = body
+
+    @classmethod
+    def from_dict(cls, post):
+        # Ключ userId - как в API, user_id - как в таблице Laba3
+        user_id = post["userId"] if "userId" in post else post["user_id"]
+        return cls(post["id"], user_id, post["title"], post["body"])
+
+    def to_dict(self):
+        return {"userId": self.user_id, "id": self.id, "title": self.title, "body": self.body}
+
+    def as_row(self):
+        return self.id, self.user_id, self.title, self.body
+
+    def __eq__(self, other):
+        return isinstance(other, Post) and self.as_row() == other.as_row()
+
+    def __repr__(self):
+        return f"Post(id={self.id}, user_id={self.user_id}, title={self.title!r})"
+
+
+class TextColumn:
+    # Строки подряд в одном буфере UTF-8; строка i - data[starts[i]:ends[i]].
+    # Выборка копирует только смещения, буфер остаётся общим
+    def __init__(self, data, starts, ends):
+        self.data = data
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_strings(cls, strings):
+        strings = list(strings)
+        joined = "".join(strings)
+        data = joined.encode("utf-8")
+        if len(data) == len(joined):
+            # Только ASCII: длина в байтах равна длине строки, кодировать по одной не нужно
+            lengths = np.fromiter(map(len, strings), dtype="int64", count=len(strings))
+        else:
+            lengths = np.fromiter((len(s.encode("utf-8")) for s in strings), dtype="int64", count=len(strings))
+        offsets = np.zeros(len(strings) + 1, dtype="int64")
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(data, offsets[:-1], offsets[1:])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        return self.data[self.starts[i]:self.ends[i]].decode("utf-8")
+
+    def take(self, index):
+        return TextColumn(self.data, self.starts[index], self.ends[index])
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.starts.nbytes + self.ends.nbytes
+
+
+class PostsStore:
+    def __init__(self, ids, user_ids, titles, bodies):
+        self.ids = ids
+        self.user_ids = user_ids
+        self.titles = titles
+        self.bodies = bodies
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows - кортежи (id, user_id, title, body), например из SQLite
+        rows = list(rows)
+        ids, user_ids, titles, bodies = zip(*rows) if rows else ((), (), (), ())
+        return cls(np.array(ids, dtype="int64"), np.array(user_ids, dtype="int32"),
+                   TextColumn.from_strings(titles), TextColumn.from_strings(bodies))
+
+    @classmethod
+    def from_dicts(cls, posts):
+        # Колонки собираются напрямую, без промежуточного Post на каждый словарь
+        posts = list(posts)
+        user_key = "userId" if not posts or "userId" in posts[0] else "user_id"
+        return cls(np.fromiter((post["id"] for post in posts), dtype="int64", count=len(posts)),
+                   np.fromiter((post[user_key] for post in posts), dtype="int32", count=len(posts)),
+                   TextColumn.from_strings(post["title"] for post in posts),
+                   TextColumn.from_strings(post["body"] for post in posts))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def post(self, i):
+        return Post(int(self.ids[i]), int(self.user_ids[i]), self.titles[i], self.bodies[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.post(i)
+
+    def to_dicts(self):
+        return [post.to_dict() for post in self]
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + self.user_ids.nbytes + self.titles.nbytes + self.bodies.nbytes
+
+    # --- фильтры: булевы маски длины len(self), их можно комбинировать через & и | ---
+
+    def by_user(self, *user_ids):
+        return np.isin(self.user_ids, user_ids)
+
+    def user_parity(self, even=True):
+        return (self.user_ids % 2 == 0) if even else (self.user_ids % 2 == 1)
+
+    def id_range(self, low=None, high=None):
+        # Полуинтервал [low, high)
+        return self.range_mask(self.ids, low, high)
+
+    def user_range(self, low=None, high=None):
+        return self.range_mask(self.user_ids, low, high)
+
+    @staticmethod
+    def range_mask(column, low, high):
+        mask = np.ones(len(column), dtype=bool)
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column < high
+        return mask
+
+    def select(self, mask):
+        index = np.flatnonzero(mask)
+        return PostsStore(self.ids[index], self.user_ids[index], self.titles.take(index), self.bodies.take(index))
+
+    # --- группировка ---
+
+    def counts_by_user(self):
+        users, counts = np.unique(self.user_ids, return_counts=True)
+        return dict(zip(users.tolist(), counts.tolist()))
+
+    def group_by_user(self):
+        # user_id -> индексы его постов (в исходном порядке)
+        order = np.argsort(self.user_ids, kind="stable")
+        users, starts = np.unique(self.user_ids[order], return_index=True)
+        return dict(zip(users.tolist(), np.split(order, starts[1:])))
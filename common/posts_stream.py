@@ -0,0 +1,438 @@
+import asyncio
+import codecs
+import json
+import queue
+import threading
+
+from common.http_cache import cache_key
+from common.metrics import count, span
+from common.posts_db import BATCH_SIZE, LABA3_COLUMNS, bulk_insert
+from common.posts_sync import sync_posts
+
+# Потоковая загрузка постов: HTTP-ответ разбирается по мере поступления
+# (без response.json() на всё тело), а этапы загрузка -> разбор -> проверка ->
+# пакетная вставка связаны ограниченными очередями и работают одновременно.
+# Пиковая память определяется размерами очередей и пачки, а не размером ленты.
+
+CHUNK_SIZE = 64 * 1024
+QUEUE_SIZE = 64
+GROUP_SIZE = 512
+PAGE_SIZE = 100
+PAGE_WAVE = 8
+FEED_POLL = 0.005
+WHITESPACE = " \t\r\n"
+DELIMITERS = WHITESPACE + ",]"
+
+
+class StreamError(Exception):
+    pass
+
+
+class Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+END = object()
+
+
+def iter_json_array(chunks):
+    # Генератор элементов JSON-массива верхнего уровня из потока байтовых кусков
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+    state = "start"
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        if pos >= len(buffer) or state == "value":
+            need_more = pos >= len(buffer)
+            if state == "value" and not need_more:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    need_more = True
+                else:
+                    # Число или литерал могли оборваться на границе куска
+                    if not exhausted and not isinstance(item, (dict, list, str)) and (
+                            end == len(buffer) or buffer[end] not in DELIMITERS):
+                        need_more = True
+                    else:
+                        pos = end
+                        state = "separator"
+                        yield item
+                        continue
+            if need_more:
+                if exhausted and state == "start":
+                    return  # пустой поток (например, ответ 304 без тела) - элементов нет
+                if exhausted:
+                    raise StreamError("JSON оборвался или повреждён")
+                try:
+                    chunk = text.decode(next(chunks))
+                except StopIteration:
+                    chunk = text.decode(b"", final=True)
+                    exhausted = True
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise StreamError("ожидался JSON-массив")
+            pos += 1
+            state = "first"
+        elif char == "]" and state in ("first", "separator"):
+            return
+        elif state == "separator":
+            if char != ",":
+                raise StreamError(f"ожидалась запятая, получено {char!r}")
+            pos += 1
+            state = "value"
+        else:
+            state = "value"
+
+
+def validate_post(post):
+    # Пост из API -> кортеж для вставки, либо None, если запись некорректна
+    if not isinstance(post, dict):
+        return None
+    try:
+        post_id = int(post["id"])
+        user_id = int(post["userId"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    title, body = post.get("title"), post.get("body")
+    if not isinstance(title, str) or not isinstance(body, str):
+        return None
+    return post_id, user_id, title, body
+
+
+def slices(body, size=CHUNK_SIZE):
+    view = memoryview(body)
+    for offset in range(0, len(view), size):
+        yield view[offset:offset + size]
+
+
+class FetchStatus:
+    def __init__(self):
+        self.changed = True
+        self.bytes = 0
+        self.total_bytes = None
+        self.total_count = None  # X-Total-Count постраничного ответа, если сервер его прислал
+
+
+def _open_cached(cache, key, status):
+    # Свежая запись кэша отдаётся без запроса; возвращает (запись, свежая ли)
+    entry = cache.lookup(key) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.record_hit(entry)
+        status.changed = False
+        return entry, True
+    return entry, False
+
+
+def http_chunks(session, url, status, cache=None, params=None, timeout=None, skip_unchanged=False):
+    # Куски тела ответа requests; тело кэшируется, только если укладывается в лимит кэша
+    key = cache_key(url, params)
+    entry, fresh = _open_cached(cache, key, status)
+    if not fresh:
+        headers = entry.conditional_headers() if entry is not None else {}
+        with session.get(url, params=params, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and entry is not None:
+                cache.record_not_modified(key, entry)
+                status.changed = False
+            else:
+                response.raise_for_status()
+                length = response.headers.get("Content-Length")
+                status.total_bytes = int(length) if length and length.isdigit() else None
+                kept = [] if cache is not None else None
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    status.bytes += len(chunk)
+                    if kept is not None:
+                        kept.append(chunk)
+                        if status.bytes > cache.max_bytes:
+                            kept = None
+                    yield chunk
+                if kept is not None:
+                    cache.store(key, b"".join(kept), response.headers)
+                return
+    if not skip_unchanged:
+        status.total_bytes = len(entry.body)
+        for chunk in slices(entry.body):
+            status.bytes += len(chunk)
+            yield chunk
+
+
+async def aiohttp_chunks(session, url, status, cache=None, params=None, skip_unchanged=False):
+    # То же для aiohttp.ClientSession
+    key = cache_key(url, params)
+    entry, fresh = _open_cached(cache, key, status)
+    if not fresh:
+        headers = entry.conditional_headers() if entry is not None else {}
+        async with session.get(url, params=params, headers=headers) as response:
+            total = response.headers.get("X-Total-Count")
+            status.total_count = int(total) if total and total.isdigit() else None
+            if response.status == 304 and entry is not None:
+                cache.record_not_modified(key, entry)
+                status.changed = False
+            else:
+                response.raise_for_status()
+                status.total_bytes = response.content_length
+                kept = [] if cache is not None else None
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    status.bytes += len(chunk)
+                    if kept is not None:
+                        kept.append(chunk)
+                        if status.bytes > cache.max_bytes:
+                            kept = None
+                    yield chunk
+                if kept is not None:
+                    cache.store(key, b"".join(kept), response.headers)
+                return
+    if not skip_unchanged:
+        status.total_bytes = len(entry.body)
+        for chunk in slices(entry.body):
+            status.bytes += len(chunk)
+            yield chunk
+
+
+def array_body(body):
+    # Содержимое JSON-массива без внешних скобок
+    body = bytes(body).strip()
+    if not (body.startswith(b"[") and body.endswith(b"]")):
+        raise StreamError("ожидался JSON-массив")
+    return body[1:-1].strip()
+
+
+async def aiohttp_paged_chunks(session, url, status, cache=None, page_size=PAGE_SIZE, semaphore=None,
+                               wave=PAGE_WAVE, skip_unchanged=False):
+    # Страницы ?_page=N&_limit=page_size запрашиваются волнами по wave штук
+    # параллельно (одновременно - не больше, чем пускает semaphore) и по порядку
+    # отдаются дальше кусками одного JSON-массива, как только волна готова: в
+    # памяти не больше одной волны. Число страниц берётся из X-Total-Count, а
+    # если его нет (страница из кэша) - список кончается на первой пустой
+    # странице. Каждая страница кэшируется отдельно
+    async def fetch(page):
+        page_status = FetchStatus()
+        params = {"_page": page, "_limit": page_size}
+        if semaphore is None:
+            body = b"".join([chunk async for chunk in aiohttp_chunks(session, url, page_status, cache, params)])
+        else:
+            async with semaphore:
+                body = b"".join([chunk async for chunk in aiohttp_chunks(session, url, page_status, cache, params)])
+        return array_body(body), page_status
+
+    sent = 0
+
+    def piece(items):
+        nonlocal sent
+        chunk = (b"[" if sent == 0 else b",") + items
+        sent += 1
+        status.bytes += len(chunk)
+        return chunk
+
+    # Пока ни одна страница не изменилась, они придерживаются: если не
+    # изменилось ничего, при skip_unchanged отдавать нечего
+    held = []
+    status.changed = False
+    pages_total = None
+    first_digest = None
+    first = 1
+    done = False
+    while not done:
+        last = first + wave - 1 if pages_total is None else min(first + wave - 1, pages_total)
+        results = await asyncio.gather(*(fetch(page) for page in range(first, last + 1)))
+        for page, (items, page_status) in enumerate(results, first):
+            if page == 1:
+                first_digest = hash(items)
+                if page_status.total_count is not None:
+                    pages_total = max(1, -(-page_status.total_count // page_size))
+                    status.total_bytes = (len(items) + 1) * pages_total + 1  # оценка для прогресса
+            elif page == 2 and items and hash(items) == first_digest:
+                done = True  # сервер не понимает _page/_limit и отдаёт весь список каждый раз
+                break
+            if not items:
+                done = True
+                break
+            status.changed = status.changed or page_status.changed
+            if status.changed:
+                for kept in held:
+                    yield piece(kept)
+                held = []
+                yield piece(items)
+            else:
+                held.append(items)
+            if pages_total is not None and page >= pages_total:
+                done = True
+                break
+        first = last + 1
+
+    if not status.changed:
+        if skip_unchanged:
+            return
+        for kept in held:
+            yield piece(kept)
+    status.bytes += 1
+    yield b"]" if sent else b"[]"
+
+
+class IngestStats:
+    def __init__(self):
+        self.parsed = 0
+        self.invalid = 0
+        self.inserted = 0
+
+    def __str__(self):
+        return f"разобрано {self.parsed}, отброшено {self.invalid}, обработано {self.inserted}"
+
+
+class IngestPipeline:
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.chunks = queue.Queue(queue_size)
+        self.cancelled = threading.Event()
+        self.status = FetchStatus()
+        self.stats = IngestStats()
+        self.sync_stats = None
+
+    # --- сторона загрузки (может работать в любом потоке) ---
+
+    def put(self, target, item):
+        while not self.cancelled.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise StreamError("конвейер остановлен")
+
+    def feed(self, chunk):
+        self.put(self.chunks, chunk)
+
+    async def feed_async(self, chunk):
+        # Для загрузки из цикла asyncio: при полной очереди ждём, не блокируя цикл
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put_nowait(chunk)
+                return
+            except queue.Full:
+                await asyncio.sleep(FEED_POLL)
+        raise StreamError("конвейер остановлен")
+
+    def close(self, target, error=None):
+        # Сигнал конца потока; если конвейер уже остановлен, сообщать некому
+        try:
+            self.put(target, Failure(error) if error is not None else END)
+        except StreamError:
+            pass
+
+    def finish(self, error=None):
+        self.close(self.chunks, error)
+
+    def start_fetch(self, chunks):
+        def fetch():
+            try:
+                for chunk in chunks:
+                    self.feed(chunk)
+            except BaseException as e:
+                self.finish(e)
+            else:
+                self.finish()
+
+        thread = threading.Thread(target=fetch, daemon=True)
+        thread.start()
+        return thread
+
+    # --- сторона записи ---
+
+    def drain(self, source):
+        while True:
+            item = source.get()
+            if item is END:
+                return
+            if isinstance(item, Failure):
+                raise item.error
+            yield item
+
+    def drain_groups(self, source):
+        for group in self.drain(source):
+            yield from group
+
+    def stage(self, func, source, target, grouped_input=True):
+        # Между этапами элементы ходят группами, чтобы не платить за очередь на каждый пост
+        def run():
+            items = self.drain_groups(source) if grouped_input else self.drain(source)
+            group = []
+            try:
+                for item in func(items):
+                    group.append(item)
+                    if len(group) >= GROUP_SIZE:
+                        self.put(target, group)
+                        group = []
+                if group:
+                    self.put(target, group)
+            except BaseException as e:
+                self.close(target, e)
+            else:
+                self.close(target)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def parse(self, chunks):
+        for post in iter_json_array(chunks):
+            self.stats.parsed += 1
+            yield post
+
+    def validate(self, posts):
+        for post in posts:
+            row = validate_post(post)
+            if row is None:
+                self.stats.invalid += 1
+            else:
+                yield row
+
+    def ingest(self, conn, columns=LABA3_COLUMNS, conflict="OR REPLACE", batch_size=BATCH_SIZE,
+               progress=None, queue_size=QUEUE_SIZE, sync=False, writer=None):
+        # sync=True - вместо вставки всех строк применяется дельта (common.posts_sync);
+        # с writer дельта пишется через общего писателя базы, conn только читает
+        # Разбор и проверка идут в своих потоках, вставка - в вызывающем (там, где создано соединение)
+        posts = queue.Queue(queue_size)
+        rows = queue.Queue(queue_size)
+        self.stage(self.parse, self.chunks, posts, grouped_input=False)
+        self.stage(self.validate, posts, rows)
+
+        def on_batch(inserted):
+            count("ingest.rows", inserted - self.stats.inserted)
+            self.stats.inserted = inserted
+            if progress is not None:
+                progress(self)
+
+        try:
+            with span("ingest.total"):
+                if sync:
+                    self.sync_stats = sync_posts(conn, self.drain_groups(rows), columns, progress=on_batch,
+                                                 writer=writer)
+                else:
+                    bulk_insert(conn, self.drain_groups(rows), columns, conflict=conflict, batch_size=batch_size,
+                                progress=on_batch)
+        finally:
+            self.cancelled.set()
+        return self.stats
+
+    def progress_percent(self):
+        if not self.status.total_bytes:
+            return 0
+        return min(100, int(self.status.bytes / self.status.total_bytes * 100))
+
+
+def ingest_from_http(session, url, conn, columns=LABA3_COLUMNS, cache=None, timeout=None, **options):
+    pipeline = IngestPipeline()
+    pipeline.start_fetch(http_chunks(session, url, pipeline.status, cache, timeout=timeout))
+    pipeline.ingest(conn, columns, **options)
+    return pipeline
@@ -0,0 +1,145 @@
+import hashlib
+import time
+
+from common.metrics import span
+from common.posts_db import LABA3_COLUMNS, batched
+
+# Дельта-синхронизация постов: для каждой строки хранится хэш содержимого,
+# и при обновлении пишутся только новые, изменившиеся и исчезнувшие из ленты
+# строки вместо полной перезаписи INSERT OR REPLACE.
+
+SYNC_BATCH_SIZE = 500  # держим IN (...) ниже лимита параметров SQLite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS post_hashes (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    synced_at REAL,
+    scanned INTEGER,
+    changed INTEGER
+);
+"""
+
+
+def row_hash(row):
+    # row - (id, user_id, title, body); id в хэш не входит
+    digest = hashlib.blake2b(digest_size=8)
+    for value in row[1:]:
+        digest.update(str(value).encode())
+        digest.update(b"\x1f")
+    return digest.digest()
+
+
+class SyncStats:
+    def __init__(self):
+        self.scanned = 0
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+
+    @property
+    def changed(self):
+        return self.inserted + self.updated + self.deleted
+
+    def __str__(self):
+        return (f"изменено {self.changed} из {self.scanned} "
+                f"(+{self.inserted}, ~{self.updated}, -{self.deleted})")
+
+
+def ensure_schema(conn):
+    conn.executescript(SCHEMA)
+
+
+def last_sync(conn, source="posts"):
+    ensure_schema(conn)
+    return conn.execute("SELECT synced_at, scanned, changed FROM sync_state WHERE source = ?",
+                        (source,)).fetchone()
+
+
+def start_sync(conn):
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS sync_seen (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM sync_seen")
+
+
+def write_batch(conn, ids, insert, inserts, update, updates, save_hash, hashes):
+    # id мог уже встретиться в прошлой пачке - тогда строка записана и сейчас обновляется
+    conn.executemany("INSERT OR IGNORE INTO sync_seen (id) VALUES (?)", ((i,) for i in ids))
+    if inserts:
+        conn.executemany(insert, inserts)
+    if updates:
+        conn.executemany(update, updates)
+    conn.executemany(save_hash, hashes)
+
+
+def finish_sync(conn, stats, table, id_col, source, delete_missing):
+    if delete_missing and stats.scanned:
+        # Удаляем только строки, пришедшие из ленты раньше (есть хэш), но пропавшие из неё;
+        # записи, добавленные вручную, хэша не имеют и не трогаются. Пустая лента
+        # (например, пропущенный ответ 304) удалением не считается
+        gone = "SELECT id FROM post_hashes WHERE id NOT IN (SELECT id FROM sync_seen)"
+        stats.deleted = conn.execute(f"DELETE FROM {table} WHERE {id_col} IN ({gone})").rowcount
+        conn.execute("DELETE FROM post_hashes WHERE id NOT IN (SELECT id FROM sync_seen)")
+    conn.execute("INSERT OR REPLACE INTO sync_state (source, synced_at, scanned, changed) VALUES (?, ?, ?, ?)",
+                 (source, time.time(), stats.scanned, stats.changed))
+    conn.execute("DELETE FROM sync_seen")
+
+
+def sync_posts(conn, rows, columns=LABA3_COLUMNS, table="posts", source="posts",
+               batch_size=SYNC_BATCH_SIZE, progress=None, delete_missing=True, writer=None):
+    # writer (common.db_writer.DbWriter) - запись идёт через общего писателя,
+    # а conn только читает; временная таблица sync_seen живёт на соединении писателя
+    ensure_schema(conn)
+
+    def write(func, *args):
+        if writer is not None:
+            return writer.call(func, *args).result()
+        with conn:
+            return func(conn, *args)
+
+    id_col, user_col, title_col, body_col = columns
+    select = (f"SELECT p.{id_col}, h.hash, p.{user_col}, p.{title_col}, p.{body_col} "
+              f"FROM {table} p LEFT JOIN post_hashes h ON h.id = p.{id_col} WHERE p.{id_col} IN ")
+    insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES (?, ?, ?, ?)"
+    update = f"UPDATE {table} SET {user_col} = ?, {title_col} = ?, {body_col} = ? WHERE {id_col} = ?"
+    save_hash = "INSERT OR REPLACE INTO post_hashes (id, hash) VALUES (?, ?)"
+
+    stats = SyncStats()
+    write(start_sync)
+
+    for batch in batched(rows, min(batch_size, SYNC_BATCH_SIZE)):
+        # При повторе id в ленте побеждает последний: внутри пачки - здесь, а повтор
+        # из прошлой пачки уже записан и ниже сравнивается с ней как обычное обновление
+        batch = {row[0]: row for row in batch}
+        placeholders = ", ".join("?" * len(batch))
+        existing, hashed = {}, set()
+        for post_id, stored_hash, *content in conn.execute(f"{select}({placeholders})", list(batch)):
+            # Строки без сохранённого хэша (база до первой синхронизации) сравниваем по содержимому
+            if stored_hash is not None:
+                hashed.add(post_id)
+            existing[post_id] = stored_hash or row_hash((post_id, *content))
+
+        inserts, updates, hashes = [], [], []
+        for post_id, row in batch.items():
+            new_hash = row_hash(row)
+            old_hash = existing.get(post_id)
+            if old_hash is None:
+                inserts.append(row)
+            elif old_hash != new_hash:
+                updates.append((*row[1:], post_id))
+            if old_hash != new_hash or post_id not in hashed:
+                hashes.append((post_id, new_hash))
+
+        with span("sync.write_batch"):
+            write(write_batch, list(batch), insert, inserts, update, updates, save_hash, hashes)
+
+        stats.scanned += len(batch)
+        stats.inserted += len(inserts)
+        stats.updated += len(updates)
+        if progress is not None:
+            progress(stats.scanned)
+
+    write(finish_sync, stats, table, id_col, source, delete_missing)
+    return stats
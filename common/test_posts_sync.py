@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.db_pool import ConnectionPool
+from common.db_writer import DbWriter
+from common.posts_sync import SYNC_BATCH_SIZE, last_sync, sync_posts
+
+# Повтор id в ленте через границу пачки: второй раз он приходит, когда первая
+# пачка уже записана, и должен стать обновлением, а не ошибкой UNIQUE
+
+TABLE = "CREATE TABLE posts (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, body TEXT)"
+
+
+def feed():
+    rows = [(i, 1, f"title {i}", "body") for i in range(1, SYNC_BATCH_SIZE + 100)]
+    rows.append((5, 2, "title 5 again", "body"))
+    return rows
+
+
+@pytest.mark.parametrize("use_writer", [False, True])
+def test_duplicate_id_across_batches(tmp_path, use_writer):
+    path = str(tmp_path / "posts.db")
+    pool = ConnectionPool(path)
+    with pool.transaction() as conn:
+        conn.execute(TABLE)
+    conn = pool.connection()
+    writer = DbWriter(pool).start() if use_writer else None
+    try:
+        stats = sync_posts(conn, feed(), writer=writer)
+    finally:
+        if writer is not None:
+            writer.stop()
+
+    assert stats.inserted == SYNC_BATCH_SIZE + 99
+    assert stats.updated == 1
+    check = sqlite3.connect(path)
+    assert check.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == SYNC_BATCH_SIZE + 99
+    assert check.execute("SELECT user_id, title FROM posts WHERE id = 5").fetchone() == (2, "title 5 again")
+    check.close()
+    assert last_sync(conn)[1] == stats.scanned
+
+    # Повторная синхронизация той же ленты ничего не удаляет, повтор снова побеждает
+    again = sync_posts(conn, feed())
+    assert again.inserted == again.deleted == 0
+    assert conn.execute("SELECT title FROM posts WHERE id = 5").fetchone() == ("title 5 again",)
+    pool.close_all()